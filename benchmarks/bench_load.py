@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Load time benchmark of the RestApiSkill
+
+The import time of the skill package is measured in fresh interpreters with
+python -X importtime, the skill is then constructed against an in-process
+FakeBus to measure initialize() and the settings reloads. The number of bus
+listeners per message type is checked after the reloads to catch handlers
+registered more than once.
+
+    python benchmarks/bench_load.py --runs 10 --reloads 20 --output load.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+from unittest import mock
+
+from bench_rest_api import CONFIG, SKILL_ID, git_revision, setup_home
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_times(runs: int, top: int) -> dict:
+    """Import the skill package in fresh interpreters and return the
+    median cumulative import time with the slowest modules.
+    """
+    totals: List[int] = []
+    modules: Dict[str, List[int]] = {}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import skill_rest_api"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            _, cumulative, name = line[len("import time:") :].split("|")
+            name = name.strip()
+            modules.setdefault(name, []).append(int(cumulative))
+            if name == "skill_rest_api":
+                totals.append(int(cumulative))
+
+    slowest: List[Tuple[str, float]] = sorted(
+        ((name, statistics.median(values)) for name, values in modules.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+    return {
+        "runs": runs,
+        "total_ms": round(statistics.median(totals) / 1000, 2),
+        "slowest_ms": {name: round(value / 1000, 2) for name, value in slowest},
+    }
+
+
+def initialize_times(reloads: int) -> dict:
+    """Construct the skill and reload its settings, return the durations
+    and the number of listeners registered per message type.
+    """
+    # pylint: disable=import-outside-toplevel
+    from ovos_utils.fakebus import FakeBus
+    from skill_rest_api import RestApiSkill
+    from skill_rest_api.constants import MSG_TYPE
+
+    with mock.patch(
+        "ovos_config.config.Configuration", return_value=CONFIG
+    ), mock.patch("ovos_utils.network_utils.is_connected", return_value=True):
+        bus = FakeBus()
+        start: float = time.perf_counter()
+        skill = RestApiSkill(skill_id=SKILL_ID, bus=bus)
+        initialize: float = time.perf_counter() - start
+
+        durations: List[float] = []
+        for _ in range(reloads):
+            start = time.perf_counter()
+            skill.on_settings_changed()
+            durations.append(time.perf_counter() - start)
+
+        listeners: Dict[str, int] = {
+            msg_type: len(bus.ee.listeners(msg_type))
+            for msg_type in set(MSG_TYPE.values())
+            if bus.ee.listeners(msg_type)
+        }
+        skill.default_shutdown()
+
+    return {
+        "initialize_ms": round(initialize * 1000, 2),
+        "reloads": reloads,
+        "reload_p50_ms": round(statistics.median(durations) * 1000, 2),
+        "reload_max_ms": round(max(durations) * 1000, 2),
+        "listeners": listeners,
+        "duplicated": sorted(name for name, count in listeners.items() if count > 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--reloads", type=int, default=20)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", default="bench_load.json")
+    args = parser.parse_args()
+
+    home: str = tempfile.mkdtemp(prefix="rest-api-bench-")
+    setup_home(home)
+    sys.path.insert(0, str(ROOT))
+
+    report: dict = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "import": import_times(args.runs, args.top),
+        **initialize_times(args.reloads),
+    }
+
+    print(f"import          {report['import']['total_ms']:>10} ms")
+    print(f"initialize      {report['initialize_ms']:>10} ms")
+    print(f"reload p50      {report['reload_p50_ms']:>10} ms")
+    if report["duplicated"]:
+        print(f"duplicated handlers: {', '.join(report['duplicated'])}")
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(f"results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""Throughput and latency benchmark of the RestApiSkill handlers
+
+The skill is loaded against an in-process FakeBus with a stubbed
+Configuration, a stubbed is_connected() and a temporary home directory.
+Simulated clients fire a weighted mix of ovos.api.* requests and wait for
+each answer, the results are printed and saved as JSON so runs could be
+compared over time.
+
+    python benchmarks/bench_rest_api.py --clients 8 --requests 2000 \\
+        --mix info=4,is_awake=4,internet=2,config=1,skill_settings=1 \\
+        --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from base64 import b64encode
+from collections import defaultdict, deque
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional
+from unittest import mock
+from uuid import uuid4
+
+SKILL_ID = "skill-rest-api.smartgic"
+API_KEY = "benchmark-api-key"
+DEFAULT_MIX = "info=4,is_awake=4,internet=2,config=1,skill_settings=1"
+CONFIG = {
+    "lang": "en-us",
+    "secondary_langs": [],
+    "log_level": "INFO",
+    "listener": {"wake_word": "hey_mycroft"},
+    "location": {
+        "city": {"name": "Montreal", "state": {"country": {"name": "Canada"}}},
+        "timezone": {"code": "America/Montreal"},
+    },
+    "tts": {
+        "module": "ovos-tts-plugin-dummy",
+        "ovos-tts-plugin-dummy": {"voice": "default"},
+    },
+    "stt": {"module": "ovos-stt-plugin-dummy"},
+}
+PAYLOADS = {
+    "info": {},
+    "is_awake": {},
+    "internet": {},
+    "config": {},
+    "skill_settings": {"skill": SKILL_ID},
+    "cache_stats": {},
+    "metrics": {},
+    "batch": {
+        "requests": [
+            {"id": "info", "type": "info"},
+            {"id": "is_awake", "type": "is_awake"},
+            {"id": "internet", "type": "internet"},
+            {"id": "config", "type": "config", "data": {"paths": ["/lang"]}},
+        ]
+    },
+}
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """Parse a name=weight,name=weight mix of message types."""
+    weights: Dict[str, int] = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in PAYLOADS:
+            raise SystemExit(f"unsupported message type: {name}")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+def setup_home(home: str) -> None:
+    """Provision the temporary home with the skill settings and a small
+    TTS cache.
+    """
+    os.environ["HOME"] = home
+    os.environ["XDG_CONFIG_HOME"] = f"{home}/.config"
+    settings: Path = Path(home) / ".config/mycroft/skills" / SKILL_ID
+    settings.mkdir(parents=True)
+    (settings / "settings.json").write_text(
+        json.dumps({"api_key": API_KEY, "persist_sleep_state": False, "rate_limit": 0}),
+        encoding="utf-8",
+    )
+    cache: Path = Path(home) / ".cache/mycroft/ovos-tts-plugin-dummy/default/en-us"
+    cache.mkdir(parents=True)
+    for index in range(100):
+        (cache / f"{index}.wav").write_bytes(os.urandom(1024))
+
+
+class Client:
+    """Send requests on the bus and wait for their answers.
+
+    Answers are matched on the request_id echoed in their context, or in
+    FIFO order per message type when the skill doesn't echo it.
+    """
+
+    def __init__(self, bus, msg_types: Dict[str, str], app_key: str) -> None:
+        self.bus = bus
+        self.app_key: str = app_key
+        self._lock: Lock = Lock()
+        self._waiting: Dict[str, dict] = {}
+        self._queues: Dict[str, deque] = defaultdict(deque)
+        self.matched: Dict[str, int] = {"request_id": 0, "fifo": 0}
+        for msg_type in msg_types.values():
+            bus.on(f"{msg_type}.answer", self._on_answer)
+
+    def _on_answer(self, message) -> None:
+        """Release the request waiting for this answer."""
+        from ovos_bus_client.message import Message
+
+        if isinstance(message, str):
+            message = Message.deserialize(message)
+        with self._lock:
+            waiter: Optional[dict] = self._waiting.pop(
+                message.context.get("request_id"), None
+            )
+            queue: deque = self._queues[message.msg_type]
+            if waiter is not None:
+                self.matched["request_id"] += 1
+            else:
+                while queue and waiter is None:
+                    waiter = self._waiting.pop(queue.popleft(), None)
+                self.matched["fifo"] += waiter is not None
+        if waiter is not None:
+            waiter["answer"] = message
+            waiter["event"].set()
+
+    def request(self, msg_type: str, data: dict, timeout: float = 10) -> dict:
+        """Send a request and return its latency, its answer size and
+        whether the answer is an error.
+        """
+        from ovos_bus_client.message import Message
+
+        request_id: str = uuid4().hex
+        waiter: dict = {"event": Event(), "answer": None}
+        with self._lock:
+            self._waiting[request_id] = waiter
+            self._queues[f"{msg_type}.answer"].append(request_id)
+        start: float = time.perf_counter()
+        self.bus.emit(
+            Message(
+                msg_type,
+                data={"app_key": self.app_key, **data},
+                context={"request_id": request_id},
+            )
+        )
+        answered: bool = waiter["event"].wait(timeout)
+        latency: float = time.perf_counter() - start
+        with self._lock:
+            self._waiting.pop(request_id, None)
+        size: int = 0
+        error: bool = False
+        if answered:
+            size = len(json.dumps(waiter["answer"].data, default=str))
+            error = "error" in waiter["answer"].data
+        return {"latency": latency, "size": size, "answered": answered, "error": error}
+
+
+def percentile(values: List[float], quantile: float) -> float:
+    """Nearest rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered: List[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+def run_load(client: Client, msg_types: dict, weights: dict, args) -> dict:
+    """Fire the requests mix from concurrent clients and aggregate the
+    results per message type.
+    """
+    names: List[str] = list(weights)
+    samples: Dict[str, List[dict]] = defaultdict(list)
+    lock: Lock = Lock()
+    per_client: int = args.requests // args.clients
+
+    def _worker(seed: int) -> None:
+        rng = random.Random(seed)
+        local: Dict[str, List[dict]] = defaultdict(list)
+        for name in rng.choices(names, [weights[n] for n in names], k=per_client):
+            local[name].append(client.request(msg_types[name], PAYLOADS[name]))
+        with lock:
+            for name, results in local.items():
+                samples[name].extend(results)
+
+    threads: List[Thread] = [
+        Thread(target=_worker, args=(args.seed + index,))
+        for index in range(args.clients)
+    ]
+    start: float = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed: float = time.perf_counter() - start
+
+    results: dict = {}
+    for name, values in samples.items():
+        latencies: List[float] = [v["latency"] for v in values if v["answered"]]
+        sizes: List[int] = [v["size"] for v in values if v["answered"]]
+        results[name] = {
+            "requests": len(values),
+            "timeouts": len(values) - len(latencies),
+            "errors": sum(v["error"] for v in values),
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "answer_bytes_avg": sum(sizes) // len(sizes) if sizes else 0,
+        }
+    return {"elapsed": round(elapsed, 3), "types": results}
+
+
+def run_allocations(client: Client, msg_types: dict, weights: dict, count: int) -> dict:
+    """Measure the memory allocated per request type with tracemalloc,
+    requests are sent sequentially to keep the measure isolated.
+    """
+    results: dict = {}
+    for name in weights:
+        client.request(msg_types[name], PAYLOADS[name])
+        tracemalloc.start()
+        before: int = tracemalloc.get_traced_memory()[0]
+        for _ in range(count):
+            client.request(msg_types[name], PAYLOADS[name])
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {
+            "peak_bytes": (peak - before) // count,
+            "retained_bytes": (current - before) // count,
+        }
+    return results
+
+
+def git_revision() -> Optional[str]:
+    """Return the current git revision if available."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--allocations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_rest_api.json")
+    args = parser.parse_args()
+    weights: Dict[str, int] = parse_mix(args.mix)
+
+    home: str = tempfile.mkdtemp(prefix="rest-api-bench-")
+    setup_home(home)
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+    # pylint: disable=import-outside-toplevel
+    from ovos_utils.fakebus import FakeBus
+    from skill_rest_api import RestApiSkill
+    from skill_rest_api.constants import MSG_TYPE
+
+    with mock.patch(
+        "ovos_config.config.Configuration", return_value=CONFIG
+    ), mock.patch("ovos_utils.network_utils.is_connected", return_value=True):
+        bus = FakeBus()
+        skill = RestApiSkill(skill_id=SKILL_ID, bus=bus)
+        if skill.settings.get("api_key") != API_KEY:
+            raise SystemExit(f"settings.json was not loaded from {home}")
+        client = Client(
+            bus, MSG_TYPE, b64encode(API_KEY.encode("utf-8")).decode("utf-8")
+        )
+        client.request(MSG_TYPE["internet"], {"refresh": True})
+
+        load: dict = run_load(client, MSG_TYPE, weights, args)
+        allocations: dict = run_allocations(client, MSG_TYPE, weights, args.allocations)
+        skill.default_shutdown()
+
+    for name, values in allocations.items():
+        load["types"].setdefault(name, {}).update(
+            alloc_peak_bytes=values["peak_bytes"],
+            alloc_retained_bytes=values["retained_bytes"],
+        )
+    report: dict = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "clients": args.clients,
+        "mix": weights,
+        "matched": dict(client.matched),
+        **load,
+    }
+
+    print(
+        f"{'type':<16}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'bytes':>10}"
+        f"{'errors':>8}{'timeouts':>10}"
+    )
+    for name, values in sorted(report["types"].items()):
+        print(
+            f"{name:<16}{values.get('rps', 0):>10}{values.get('p50_ms', 0):>10}"
+            f"{values.get('p99_ms', 0):>10}{values.get('answer_bytes_avg', 0):>10}"
+            f"{values.get('errors', 0):>8}{values.get('timeouts', 0):>10}"
+        )
+    print(
+        f"answers matched by request_id: {report['matched']['request_id']}, "
+        f"by order: {report['matched']['fifo']}"
+    )
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(f"results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,80 @@
 """rest-api entrypoint skill
 """
 
-import json
-import platform
+from base64 import b64encode
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial, wraps
 from pathlib import Path
+from threading import Lock
+from uuid import uuid4
+from typing import Callable, Dict, List, Optional, Tuple
 from ovos_bus_client.message import Message
-from ovos_config.config import Configuration
-from ovos_core import version
 from ovos_utils import classproperty
 from ovos_utils.log import LOG
 from ovos_workshop.skills import OVOSSkill
 
 # from mycroft.configuration.config import LocalConf, USER_CONFIG
 # from mycroft.skills.msm_wrapper import create_msm, build_msm_config
-from ovos_utils.network_utils import is_connected
-from .utils import check_auth, send, delete
-from .constants import MSG_TYPE, SLEEP_MARK, TTS_CACHE_DIR, SKILLS_CONFIG_DIR
+from .awake import AwakeState
+from .cache import RANK_BY, CacheStats, prune, purge, remove_tree, stale_trashes
+from .dispatcher import Dispatcher
+from .injector import RESPONSES, UtteranceInjector
+from .logs import follow, log_files, log_path, matcher, tail
+from .metrics import Metrics
+from .prober import ConnectivityProber
+from .ratelimit import RateLimiter
+from .sampler import SystemSampler
+from .settings_cache import SettingsCache
+from .singleflight import SingleFlight, request_key
+from .subscriptions import TOPICS, Subscriptions, invalid_topics
+from .utils import (
+    as_bool,
+    check_auth,
+    client_id,
+    configuration,
+    correlation,
+    deadline_passed,
+    digest,
+    resolve_pointer,
+    send,
+    sender,
+    valid_key,
+)
+from .constants import (
+    AUTH_FAILURE_BURST,
+    AUTH_FAILURE_RATE,
+    AUTO_PRUNE_EVENT,
+    BATCH_MAX_REQUESTS,
+    CONFIG_UPDATED,
+    ENCODING_THRESHOLD,
+    LATENCY_BUCKETS,
+    LOGS_CHUNK_LINES,
+    LOGS_DIR,
+    LOGS_LINES,
+    LOGS_MAX_LINES,
+    LOGS_MAX_SCAN,
+    MSG_TYPE,
+    PAYLOAD_SAMPLE_RATE,
+    PROBE_INTERVAL,
+    PROBE_MAX_BACKOFF,
+    RATE_LIMIT,
+    RATE_LIMIT_BURST,
+    SETTINGS_CACHE_SIZE,
+    SLEEP_MARK,
+    SLOW_HANDLERS,
+    SUBSCRIPTION_WINDOW,
+    SYSTEM_STATS_INTERVAL,
+    SYSTEM_STATS_POINTS,
+    SYSTEM_STATS_SIZE,
+    TTS_CACHE_DIR,
+    UTTERANCE_MAX_BATCH,
+    UTTERANCE_MAX_RATE,
+    UTTERANCE_MAX_TIMEOUT,
+    UTTERANCE_TIMEOUT,
+    SKILLS_CONFIG_DIR,
+    WORKER_POOL_SIZE,
+    WORKER_QUEUE_DEPTH,
+)
 
 
 class RestApiSkill(OVOSSkill):
@@ -30,6 +89,9 @@ class RestApiSkill(OVOSSkill):
         """Check for skill functionalities requirements before trying to
         start the skill.
         """
+        # pylint: disable=import-outside-toplevel
+        from ovos_utils.process_utils import RuntimeRequirements
+
         return RuntimeRequirements(
             internet_before_load=True,
             network_before_load=True,
@@ -50,18 +112,183 @@ class RestApiSkill(OVOSSkill):
         # Make sure the requirements are fulfill.
         if not self.api_key:
             LOG.warning("api key is not defined")
+            self.configured = False
+            self.api_digest = None
         else:
             self.configured = True
+            self.api_digest = b64encode(self.api_key.encode("utf-8"))
             LOG.info("api key has been registered")
 
-        self.add_event(MSG_TYPE["info"], self._handle_info)
-        self.add_event(MSG_TYPE["cache"], self._handle_cache)
-        self.add_event(MSG_TYPE["internet"], self._handle_internet_connectivity)
-        self.add_event(MSG_TYPE["sleep"], self._handle_sleep)
-        self.add_event(MSG_TYPE["wake_up"], self._handle_wake_up)
-        self.add_event(MSG_TYPE["is_awake"], self._handle_is_awake)
-        self.add_event(MSG_TYPE["skill_settings"], self._handle_skill_settings)
-        self.add_event(MSG_TYPE["config"], self._handle_config)
+        self.encoding_threshold = self._setting(
+            "encoding_threshold", ENCODING_THRESHOLD, cast=int
+        )
+
+        self.limiter.configure(
+            self._setting("rate_limit", RATE_LIMIT),
+            self._setting("rate_limit_burst", RATE_LIMIT_BURST, minimum=1),
+        )
+        self.auth_limiter.configure(
+            self._setting("auth_failure_rate", AUTH_FAILURE_RATE),
+            self._setting("auth_failure_burst", AUTH_FAILURE_BURST, minimum=1),
+        )
+
+        self.prober.interval = self._setting(
+            "internet_probe_interval", PROBE_INTERVAL, minimum=1
+        )
+        self.prober.max_backoff = self._setting(
+            "internet_probe_max_backoff", PROBE_MAX_BACKOFF, minimum=1
+        )
+        self.prober.start()
+
+        self.sampler.interval = self._setting(
+            "system_stats_interval", SYSTEM_STATS_INTERVAL
+        )
+        if self.sampler.interval:
+            self.sampler.start()
+        else:
+            self.sampler.stop()
+
+        self.dispatcher.resize(
+            self._setting("worker_pool_size", WORKER_POOL_SIZE, minimum=1, cast=int),
+            self._setting(
+                "worker_queue_depth", WORKER_QUEUE_DEPTH, minimum=1, cast=int
+            ),
+        )
+
+        self.awake.persist = as_bool(self.settings.get("persist_sleep_state", True))
+        self.singleflight.ttl = self._setting("singleflight_ttl", 0)
+        self.subscriptions.window = self._setting(
+            "subscription_window", SUBSCRIPTION_WINDOW
+        )
+
+        self.cancel_scheduled_event(AUTO_PRUNE_EVENT)
+        prune_interval: float = self._setting("tts_cache_prune_interval", 0)
+        if prune_interval and self._setting("tts_cache_max_size", 0):
+            self.schedule_repeating_event(
+                self._handle_auto_prune,
+                None,
+                prune_interval * 60,
+                name=AUTO_PRUNE_EVENT,
+            )
+
+        if as_bool(self.settings.get("settings_inotify", False)):
+            self.settings_cache.watch(f"{Path.home()}/{SKILLS_CONFIG_DIR}")
+        else:
+            self.settings_cache.unwatch()
+
+    def _setting(
+        self,
+        name: str,
+        default: float,
+        minimum: float = 0,
+        cast: Callable[[float], float] = float,
+    ) -> float:
+        """Read a numeric setting, the default is used and a warning is
+        logged when the value is not a number or is lower than minimum.
+        """
+        value = self.settings.get(name, default)
+        try:
+            number: float = cast(float(value))
+        except (TypeError, ValueError):
+            number = minimum - 1
+        if number < minimum:
+            LOG.warning(f"invalid {name} setting {value!r}, using {default}")
+            return default
+        return number
+
+    def _register(self) -> None:
+        """Build the dispatch table of the bus handlers and register it.
+
+        The wrappers only reference the rate limiter, the worker pool and
+        the metrics which are reconfigured in place by _setup(), the table
+        is therefore built once and a settings reload doesn't register the
+        handlers twice.
+        """
+        if self.handlers:
+            return
+
+        handlers: dict = {
+            "info": self._handle_info,
+            "cache": self._handle_cache,
+            "internet": self._handle_internet_connectivity,
+            "sleep": self._handle_sleep,
+            "wake_up": self._handle_wake_up,
+            "is_awake": self._handle_is_awake,
+            "skill_settings": self._handle_skill_settings,
+            "config": self._handle_config,
+            "batch": self._handle_batch,
+            "cache_stats": self._handle_cache_stats,
+            "metrics": self._handle_metrics,
+            "logs": self._handle_logs,
+            "system_stats": self._handle_system_stats,
+            "utterance": self._handle_utterance,
+            "subscribe": self._handle_subscribe,
+            "unsubscribe": self._handle_unsubscribe,
+        }
+        for name, handler in handlers.items():
+            handler = self._expire(self.metrics.wrap(MSG_TYPE[name], handler))
+            if name in SLOW_HANDLERS:
+                handler = self.dispatcher.wrap(MSG_TYPE[name], handler, self._busy)
+            if name not in ("sleep", "wake_up"):
+                handler = self._throttle(handler)
+            self.handlers[MSG_TYPE[name]] = handler
+
+        for msg_type, handler in self.handlers.items():
+            self.add_event(msg_type, handler)
+
+    def _expire(self, handler: Callable[[Message], None]) -> Callable:
+        """Wrap a bus handler to drop the messages whose deadline passed,
+        either on the bus or while waiting in the worker pool queue.
+        """
+
+        @wraps(handler)
+        def wrapper(message: Message) -> None:
+            if deadline_passed(message):
+                LOG.debug(f"{message.msg_type} deadline passed, dropping it")
+                self.metrics.expire(str(message.msg_type))
+                return
+            handler(message)
+
+        return wrapper
+
+    def _throttle(self, handler: Callable[[Message], None]) -> Callable:
+        """Wrap a bus handler to reject the messages exceeding the rate
+        limit of their connection and message type, before any other work.
+
+        The messages without a valid key get their own buckets so they
+        can't use up the rate limit of the authenticated connections.
+        """
+
+        @wraps(handler)
+        def wrapper(message: Message) -> None:
+            retry_after: float = self.limiter.acquire(
+                sender(message),
+                str(message.msg_type),
+                "authenticated" if valid_key(self, message) else "unauthenticated",
+            )
+            if retry_after:
+                self.metrics.rate_limit(str(message.msg_type))
+                send(
+                    self,
+                    f"{message.msg_type}.answer",
+                    data={"error": "rate limited", "retry_after": retry_after},
+                    message=message,
+                    authenticated=False,
+                )
+                return
+            handler(message)
+
+        return wrapper
+
+    def _busy(self, message: Message, retry_after: float) -> None:
+        """Answer a message rejected because its queue is full."""
+        send(
+            self,
+            f"{message.msg_type}.answer",
+            data={"error": "busy", "retry_after": retry_after},
+            message=message,
+            authenticated=False,
+        )
 
     # def handle_events(self) -> None:
     #     """Handle the events sent on the bus and trigger functions when
@@ -72,195 +299,864 @@ class RestApiSkill(OVOSSkill):
     #     self.add_event(MSG_TYPE["skill_uninstall"],
     #                    self._handle_skill_uninstall)
 
+    def _build_info(self) -> dict:
+        """Collect the static information served by ovos.api.info.
+
+        None of these values change between two configuration reloads which
+        is why the result is kept as a snapshot by the skill.
+        """
+        # pylint: disable=import-outside-toplevel
+        import platform
+
+        try:
+            from ovos_core.version import OVOS_VERSION_STR
+        except ImportError:
+            OVOS_VERSION_STR = None
+
+        config: dict = configuration()
+        return {
+            "core_version": OVOS_VERSION_STR,
+            "name": config["listener"]["wake_word"],
+            "locales": {
+                "city": config["location"]["city"]["name"],
+                "country": config["location"]["city"]["state"]["country"]["name"],
+                "lang": config["lang"],
+                "secondary_langs": config.get("secondary_langs", None),
+                "timezone": config["location"]["timezone"]["code"],
+            },
+            "system": {
+                "architecture": platform.machine(),
+                "os": platform.system(),
+                "kernel": platform.release(),
+            },
+            "tts_engine": config["tts"]["module"],
+            "stt_engine": config["stt"]["module"],
+            "log_level": config["log_level"].lower(),
+        }
+
+    def _get_info(self, _: Optional[dict] = None) -> dict:
+        """Return the info snapshot, rebuilding it first if the configuration
+        changed since the last build.
+        """
+        info: dict = self.info
+        if info is None:
+            info = self.info = self._build_info()
+            self.info_stats["rebuilds"] += 1
+            LOG.debug(f"info snapshot rebuilt, stats: {self.info_stats}")
+        else:
+            self.info_stats["hits"] += 1
+        return info
+
+    def _handle_config_updated(self, _: Message) -> None:
+        """When the configuration is reloaded by the core, the info snapshot
+        and the configuration hash are invalidated and will be rebuilt on the
+        next request.
+        """
+        LOG.debug("configuration updated, invalidating cached data")
+        self.info = None
+        self.config_hash = None
+        self.singleflight.clear()
+        self.subscriptions.publish("config", lambda: {"hash": self._get_config_hash()})
+
     def _handle_info(self, message: Message) -> None:
         """When ovos.api.info event is detected on the bus, this function
-        will collect some information
-        """
-        check_auth(self, message)
-        if self.authenticated:
-            config: dict = Configuration()
-            data: dict = {}
-            data = {
-                "core_version": version.OVOS_VERSION_STR,
-                "name": config["listener"]["wake_word"],
-                "locales": {
-                    "city": config["location"]["city"]["name"],
-                    "country": config["location"]["city"]["state"]["country"]["name"],
-                    "lang": config["lang"],
-                    "secondary_langs": config.get("secondary_langs", None),
-                    "timezone": config["location"]["timezone"]["code"],
-                },
-                "system": {
-                    "architecture": platform.machine(),
-                    "os": platform.system(),
-                    "kernel": platform.release(),
-                },
-                "tts_engine": config["tts"]["module"],
-                "stt_engine": config["stt"]["module"],
-                "log_level": config["log_level"].lower(),
-            }
-            send(self, f'{MSG_TYPE["info"]}.answer', data=data)
+        will send the info snapshot built from the configuration.
+        """
+        if check_auth(self, message):
+            self._coalesce(message, self._get_info)
+
+    def _coalesce(
+        self,
+        message: Message,
+        func: Callable[[dict], dict],
+        context: Optional[Callable[[], dict]] = None,
+    ) -> None:
+        """Compute the answer of a message only once for all the identical
+        requests in flight, each requester gets its own answer context.
+        """
+        self.singleflight.do(
+            request_key(message),
+            lambda: func(message.data),
+            lambda data: send(
+                self,
+                f"{message.msg_type}.answer",
+                data=data,
+                context=context() if context else None,
+                message=message,
+            ),
+        )
 
     def _handle_internet_connectivity(self, message: Message) -> None:
         """When ovos.api.internet event is detected on the bus,
-        this function will use the is_connected() function from ovos-utils
-        to detect if the instance is connected to the Internet.
+        this function will answer with the last connectivity state known by
+        the background prober and its age in seconds.
+
+        A probe is forced when the refresh flag is set or when no probe has
+        been completed yet, the answer is then sent once the probe is done.
         """
-        check_auth(self, message)
-        if self.authenticated:
-            send(
-                self, f'{MSG_TYPE["internet"]}.answer', data={"status": is_connected()}
-            )
+        if check_auth(self, message):
+            if message.data.get("refresh") or self.prober.status is None:
+                self.prober.refresh(
+                    lambda state: send(
+                        self,
+                        f'{MSG_TYPE["internet"]}.answer',
+                        data=state,
+                        message=message,
+                    )
+                )
+            else:
+                send(
+                    self,
+                    f'{MSG_TYPE["internet"]}.answer',
+                    data=self.prober.state(),
+                    message=message,
+                )
+
+    def _get_internet(self, data: dict) -> dict:
+        """Return the connectivity state, probing first if requested."""
+        if data.get("refresh") or self.prober.status is None:
+            return self.prober.probe()
+        return self.prober.state()
 
     # def _handle_websocket_connectivity(self, message: Message) -> None:
     #     """When ovos.api.websocket event is detected on the bus,
     #     this function will use the _connected_google() function from ovos
     #     core to detect if the instance is connected to Internet.
     #     """
-    #     check_auth(self, message)
-    #     if self.authenticated:
+    #     if check_auth(self, message):
     #         send(self, f'{MSG_TYPE["websocket"]}.answer', data={"listening": True})
 
     def _handle_config(self, message: dict) -> None:
         """When ovos.api.config event is detected on the bus, this function
         will use the Configuration() function from ovos-config to retrieve the
         configuration from mycroft.conf.
+
+        A list of JSON pointers could be passed as paths to only retrieve
+        these subtrees. The answer context carries a hash of the whole
+        configuration, when the if_none_match hash sent by the client still
+        matches, a not_modified answer is sent instead of the payload.
+        """
+        if check_auth(self, message):
+            self._coalesce(
+                message,
+                self._get_config,
+                lambda: {"hash": self._get_config_hash()},
+            )
+
+    def _get_config_hash(self) -> str:
+        """Return the configuration hash, computed once per configuration
+        reload.
+        """
+        config_hash: Optional[str] = self.config_hash
+        if config_hash is None:
+            config_hash = self.config_hash = digest(configuration())
+        return config_hash
+
+    def _get_config(self, data: dict) -> dict:
+        """Retrieve the configuration from mycroft.conf, projected on the
+        requested JSON pointers if any.
         """
-        check_auth(self, message)
-        if self.authenticated:
-            data: dict = Configuration()
-            send(self, f'{MSG_TYPE["config"]}.answer', data=data)
+        config_hash: str = self._get_config_hash()
+        if data.get("if_none_match") == config_hash:
+            return {"not_modified": True, "hash": config_hash}
+
+        config: dict = configuration()
+        paths: Optional[list] = data.get("paths")
+        if not paths:
+            return config
+        if not isinstance(paths, list) or not all(
+            isinstance(pointer, str) for pointer in paths
+        ):
+            return {"error": "paths must be a list of JSON pointers"}
+
+        projection: dict = {}
+        for pointer in paths:
+            try:
+                projection[pointer] = resolve_pointer(config, pointer)
+            except KeyError:
+                projection[pointer] = None
+        return projection
 
     def _handle_skill_settings(self, message: dict) -> None:
         """When ovos.api.skill_settings event is detected on the bus,
         this function will look for a settings.json file from the skill config
         directory and read load the content as JSON.
+
+        Several skills could be retrieved at once by passing a list of skill
+        ids as skills, or "*" for every skill with a config directory.
         """
-        check_auth(self, message)
-        if self.authenticated:
-            home: str = Path.home()
-            skill: str = message.data.get("skill")
-            file: str = f"{home}/{SKILLS_CONFIG_DIR}/{skill}/settings.json"
-            if Path(file).is_file():
-                try:
-                    with open(file, encoding="utf-8") as settings_json:
-                        send(
-                            self,
-                            f'{MSG_TYPE["skill_settings"]}.answer',
-                            data=json.load(settings_json),
-                        )
-                except IOError as err:
-                    LOG.error("unable to retrieve skill settings")
-                    LOG.debug(err)
-            send(
-                self,
-                f'{MSG_TYPE["skill_settings"]}.answer',
-                data={"error": "no settings.json file found"},
-            )
+        if check_auth(self, message):
+            self._coalesce(message, self._get_skill_settings)
 
-    def _handle_sleep(self, message: dict) -> None:
-        """When recognizer_loop:sleep event is detected on the bus,
-        this function will create an empty file into /tmp. This file
-        will be looked up by the _handle_is_awake() method to determine if
-        mycroft is into sleep mode or awake.
+    def _get_skill_settings(self, data: dict) -> dict:
+        """Load the settings.json file of the skill requested in data, or of
+        every requested skill in bulk mode.
         """
-        check_auth(self, message)
-        if self.authenticated:
+        directory: Path = Path.home() / SKILLS_CONFIG_DIR
+        skills = data.get("skills")
+        if skills is None:
+            return self.settings_cache.load(
+                f'{directory}/{data.get("skill")}/settings.json'
+            )
+
+        if skills == "*":
             try:
-                Path(SLEEP_MARK).touch()
+                skills = [entry.name for entry in directory.iterdir() if entry.is_dir()]
+            except OSError as err:
+                LOG.error("unable to list skills config directory")
+                LOG.debug(err)
+                skills = []
+        elif not isinstance(skills, list) or not all(
+            isinstance(skill, str) for skill in skills
+        ):
+            return {"error": 'skills must be a list of skill ids or "*"'}
+        return {
+            "skills": self.settings_cache.load_many(
+                {skill: f"{directory}/{skill}/settings.json" for skill in skills}
+            )
+        }
+
+    def _handle_batch(self, message: Message) -> None:
+        """When ovos.api.batch event is detected on the bus, this function
+        will authenticate once and run every sub-request concurrently, the
+        results are sent in a single answer keyed by sub-request id.
+
+        Sub-requests are expected as a list of at most BATCH_MAX_REQUESTS
+        dicts with a unique id, a type (info, is_awake, internet, config or
+        skill_settings) and an optional data dict, invalid sub-requests are
+        answered with an error under their id. Sub-requests share the worker
+        pool queue of their message type and are answered busy when it is
+        full.
+        """
+        if check_auth(self, message):
+            handlers: dict = {
+                "info": self._get_info,
+                "is_awake": self._get_is_awake,
+                "internet": self._get_internet,
+                "config": self._get_config,
+                "skill_settings": self._get_skill_settings,
+            }
+            requests = message.data.get("requests") or []
+            if not isinstance(requests, list) or len(requests) > BATCH_MAX_REQUESTS:
                 send(
                     self,
-                    f'{MSG_TYPE["sleep_answer"]}.answer',
-                    data={"mark": SLEEP_MARK},
+                    f'{MSG_TYPE["batch"]}.answer',
+                    data={
+                        "error": "requests must be a list of at most "
+                        f"{BATCH_MAX_REQUESTS} sub-requests"
+                    },
+                    message=message,
                 )
-            except IOError as err:
-                LOG.error("unable to generate the sleep mark")
-                LOG.debug(err)
+                return
+
+            request_ids: List[str] = [
+                str(request.get("id", index) if isinstance(request, dict) else index)
+                for index, request in enumerate(requests)
+            ]
+            duplicates: List[str] = sorted(
+                {
+                    request_id
+                    for request_id in request_ids
+                    if request_ids.count(request_id) > 1
+                }
+            )
+            if duplicates:
+                send(
+                    self,
+                    f'{MSG_TYPE["batch"]}.answer',
+                    data={"error": f"duplicate sub-request id {', '.join(duplicates)}"},
+                    message=message,
+                )
+                return
+
+            results: dict = {}
+            futures: dict = {}
+            for request_id, request in zip(request_ids, requests):
+                if not isinstance(request, dict):
+                    results[request_id] = {"error": "invalid sub-request"}
+                    continue
+                if not isinstance(request.get("data") or {}, dict):
+                    results[request_id] = {"error": "invalid sub-request data"}
+                    continue
+                handler = handlers.get(request.get("type"))
+                if handler is None:
+                    results[request_id] = {"error": "unsupported request type"}
+                    continue
+                name: str = MSG_TYPE[request["type"]]
+                future: Optional[Future] = self.dispatcher.submit(
+                    name, handler, request.get("data") or {}
+                )
+                if future is None:
+                    results[request_id] = {
+                        "error": "busy",
+                        "retry_after": self.dispatcher.retry_after(name),
+                    }
+                    continue
+                futures[request_id] = future
+
+            if not futures:
+                send(
+                    self,
+                    f'{MSG_TYPE["batch"]}.answer',
+                    data={"results": results},
+                    message=message,
+                )
+                return
+
+            lock: Lock = Lock()
+            pending: list = [len(futures)]
+
+            def _done(request_id: str, future: Future) -> None:
+                try:
+                    result: dict = future.result()
+                except Exception as err:  # pylint: disable=broad-except
+                    LOG.error(f"unable to process batch sub-request {request_id}")
+                    LOG.debug(err)
+                    result = {"error": "sub-request failed"}
+                with lock:
+                    results[request_id] = result
+                    pending[0] -= 1
+                    if pending[0]:
+                        return
+                send(
+                    self,
+                    f'{MSG_TYPE["batch"]}.answer',
+                    data={"results": results},
+                    message=message,
+                )
+
+            for request_id, future in futures.items():
+                future.add_done_callback(partial(_done, request_id))
+
+    def _handle_sleep(self, message: dict) -> None:
+        """When recognizer_loop:sleep event is detected on the bus,
+        this function will switch the in-memory state to sleep mode, whoever
+        sent the event.
+
+        An answer is only sent when the event comes from the API, the sleep
+        mark is only reported when the state is persisted.
+        """
+        changed: bool = self.awake.sleep()
+        if changed:
+            self.subscriptions.publish("awake", {"is_awake": False})
+        if "app_key" not in message.data:
+            return
+        if check_auth(self, message):
+            send(
+                self,
+                f'{MSG_TYPE["sleep_answer"]}.answer',
+                data={
+                    "mark": SLEEP_MARK if self.awake.persist else None,
+                    "changed": changed,
+                    **self.awake.state(),
+                },
+                message=message,
+            )
 
     def _handle_wake_up(self, message: dict) -> None:
         """When recognizer_loop:wake_up event is detected on the bus,
-        this function will remove the sleep mark. This file
-        will be looked up by the _handle_is_awake() method to determine if
-        mycroft is into sleep mode or awake.
+        this function will switch the in-memory state to awake mode, whoever
+        sent the event.
+
+        An answer is only sent when the event comes from the API.
         """
         self.log.debug("recognizer_loop:wake_up message detected")
-        check_auth(self, message)
-        if self.authenticated:
-            try:
-                if Path(SLEEP_MARK).is_file():
-                    Path(SLEEP_MARK).unlink()
-                    send(
-                        self,
-                        f'{MSG_TYPE["wake_up_answer"]}.answer',
-                        data={"mark": "sleep mark deleted"},
-                    )
-                send(
-                    self,
-                    f'{MSG_TYPE["wake_up_answer"]}.answer',
-                    data={"mark": "no sleep mark to delete"},
-                )
-            except IOError as err:
-                LOG.error("unable to delete the sleep mark")
-                LOG.debug(err)
+        changed: bool = self.awake.wake_up()
+        if changed:
+            self.subscriptions.publish("awake", {"is_awake": True})
+        if "app_key" not in message.data:
+            return
+        if check_auth(self, message):
+            mark: str = (
+                "sleep mark deleted"
+                if changed and self.awake.persist
+                else "no sleep mark to delete"
+            )
+            send(
+                self,
+                f'{MSG_TYPE["wake_up_answer"]}.answer',
+                data={"mark": mark, "changed": changed, **self.awake.state()},
+                message=message,
+            )
 
     def _handle_is_awake(self, message: dict) -> None:
         """When ovos.api.is_awake event is detected on the bus,
-        this function will looke for a /tmp/sleep.mark file to
+        this function will answer from the in-memory state to
         determine if mycroft is into sleep mode or awake.
         """
-        check_auth(self, message)
-        if self.authenticated:
-            is_awake: bool = True
-            try:
-                if Path(SLEEP_MARK).is_file():
-                    is_awake = False
-                send(
-                    self, f'{MSG_TYPE["is_awake"]}.answer', data={"is_awake": is_awake}
-                )
-            except IOError as err:
-                LOG.error("unable to retrieve sleep mark")
-                LOG.debug(err)
+        if check_auth(self, message):
+            send(
+                self,
+                f'{MSG_TYPE["is_awake"]}.answer',
+                data=self._get_is_awake(),
+                message=message,
+            )
+
+    def _get_is_awake(self, _: Optional[dict] = None) -> dict:
+        """Return the in-memory sleep/awake state with the transition
+        timestamps.
+        """
+        return self.awake.state()
 
     def _handle_cache(self, message: dict) -> None:
         """When ovos.api.cache event is detected on the bus,
         this function remove cache (files and/or directories) related to the
         type.
 
-        For now only TTS cache removal is supported.
+        For now only TTS cache removal is supported. The cache directory is
+        renamed aside and an empty layout is recreated right away, the answer
+        carries a job id used by the ovos.api.cache.progress and
+        ovos.api.cache.complete events sent while the renamed tree is
+        deleted in the background.
+
+        With the prune action, only the coldest files are evicted until the
+        cache fits within max_bytes and/or max_age, the answer is sent once
+        the cache has been pruned. Invalid prune parameters are answered
+        with an error right away.
         """
-        check_auth(self, message)
-        if self.authenticated:
-            config: dict = Configuration()
-            cache_type: str = message.data.get("cache_type")
+        if check_auth(self, message):
+            data: dict = message.data
+            cache_type: str = data.get("cache_type")
+            if cache_type == "tts" and data.get("action") == "prune":
+                error: Optional[str] = None
+                rank_by: str = data.get("rank_by", "atime")
+                try:
+                    max_bytes: Optional[int] = (
+                        None
+                        if data.get("max_bytes") is None
+                        else int(data["max_bytes"])
+                    )
+                    max_age: Optional[float] = (
+                        None if data.get("max_age") is None else float(data["max_age"])
+                    )
+                except (TypeError, ValueError):
+                    error = "max_bytes and max_age must be numbers"
+                else:
+                    if (max_bytes or 0) < 0 or (max_age or 0) < 0:
+                        error = "max_bytes and max_age must be positive"
+                if error is None and rank_by not in RANK_BY:
+                    error = f"rank_by must be one of {', '.join(RANK_BY)}"
+                if error:
+                    send(
+                        self,
+                        f'{MSG_TYPE["cache"]}.answer',
+                        data={
+                            "cache_type": cache_type,
+                            "action": "prune",
+                            "status": False,
+                            "error": error,
+                        },
+                        message=message,
+                    )
+                    return
+                self.cache_executor.submit(
+                    self._prune_job, message, max_bytes, max_age, rank_by
+                )
+                return
+
             status: bool = False
+            job_id: Optional[str] = None
             if cache_type == "tts":
-                home: str = Path.home()
-                lang: str = config["lang"]
-                tts_module: str = config["tts"]["module"]
-                tts_voice: str = config["tts"][tts_module]["voice"]
-                tts_path: str = f"{home}/{TTS_CACHE_DIR}/{tts_module}"
                 try:
-                    delete(self, tts_path)
-                    Path(f"{tts_path}/{tts_voice}/{lang}").mkdir(
-                        parents=True, exist_ok=True
-                    )
+                    tts_path, tts_voice, lang = self._tts_cache_path()
+                    job_id = uuid4().hex
+                    trash: Optional[str] = purge(tts_path, tts_voice, lang, job_id)
+                    self.cache_executor.submit(self._purge_job, message, job_id, trash)
                     status = True
                 except IOError as err:
                     LOG.error("unable to clear tts cache")
                     LOG.debug(err)
+                    job_id = None
             send(
                 self,
                 f'{MSG_TYPE["cache"]}.answer',
-                data={"cache_type": cache_type, "status": status},
+                data={"cache_type": cache_type, "status": status, "job_id": job_id},
+                message=message,
+            )
+
+    def _handle_cache_stats(self, message: Message) -> None:
+        """When ovos.api.cache.stats event is detected on the bus, this
+        function will compute the TTS cache statistics and send them, only
+        the directories changed since the previous call are scanned again.
+        """
+        if check_auth(self, message):
+            try:
+                data: dict = self.cache_stats.stats()
+            except OSError as err:
+                LOG.error("unable to compute tts cache statistics")
+                LOG.debug(err)
+                data = {"error": "unable to compute tts cache statistics"}
+            send(
+                self,
+                f'{MSG_TYPE["cache_stats"]}.answer',
+                data=data,
+                message=message,
+            )
+
+    def _handle_subscribe(self, message: Message) -> None:
+        """When ovos.api.subscribe event is detected on the bus, this
+        function will subscribe the client to the requested topics (awake,
+        internet, config and cache).
+
+        The state changes of these topics are then emitted as ovos.api.event
+        messages listing the subscribed clients in their context. Invalid or
+        unknown topics are answered with an error listing the available ones.
+        """
+        if check_auth(self, message):
+            requested = message.data.get("topics") or []
+            error: Optional[str] = invalid_topics(requested)
+            if error:
+                send(
+                    self,
+                    f'{MSG_TYPE["subscribe"]}.answer',
+                    data={"error": error, "available": list(TOPICS)},
+                    message=message,
+                )
+                return
+            topics: List[str] = self.subscriptions.subscribe(
+                client_id(message), requested
+            )
+            send(
+                self,
+                f'{MSG_TYPE["subscribe"]}.answer',
+                data={"topics": topics},
+                message=message,
+            )
+
+    def _handle_unsubscribe(self, message: Message) -> None:
+        """When ovos.api.unsubscribe event is detected on the bus, this
+        function will unsubscribe the client from the requested topics, or
+        from every topic when none are given. Invalid or unknown topics are
+        answered with an error listing the available ones.
+        """
+        if check_auth(self, message):
+            requested = message.data.get("topics") or None
+            error: Optional[str] = invalid_topics(requested) if requested else None
+            if error:
+                send(
+                    self,
+                    f'{MSG_TYPE["unsubscribe"]}.answer',
+                    data={"error": error, "available": list(TOPICS)},
+                    message=message,
+                )
+                return
+            topics: List[str] = self.subscriptions.unsubscribe(
+                client_id(message), requested
+            )
+            send(
+                self,
+                f'{MSG_TYPE["unsubscribe"]}.answer',
+                data={"topics": topics},
+                message=message,
+            )
+
+    def _emit_event(self, topic: str, state: dict, clients: List[str]) -> None:
+        """Emit a state change to the subscribed clients."""
+        send(
+            self,
+            MSG_TYPE["event"],
+            data={"topic": topic, "state": state},
+            context={"clients": clients},
+        )
+
+    def _handle_metrics(self, message: Message) -> None:
+        """When ovos.api.metrics event is detected on the bus, this function
+        will send the handlers metrics as JSON, or rendered with the
+        Prometheus text format when format is set to prometheus.
+        """
+        if check_auth(self, message):
+            if message.data.get("format") == "prometheus":
+                data: dict = {"text": self.metrics.prometheus()}
+            else:
+                data = self.metrics.snapshot()
+            send(self, f'{MSG_TYPE["metrics"]}.answer', data=data, message=message)
+
+    def _handle_logs(self, message: Message) -> None:
+        """When ovos.api.logs event is detected on the bus, this function
+        will read the last lines of an OVOS log file or the lines written
+        after the offset sent by the client.
+
+        The log file is memory-mapped and scanned backwards so only its tail
+        is read, the lines could be filtered by level and regex. Results
+        larger than a chunk are streamed as numbered ovos.api.logs.chunk
+        messages before the answer, every chunk and the answer carry the
+        offset where to resume reading to follow the log.
+        """
+        if check_auth(self, message):
+            data: dict = message.data
+            directory: str = self._logs_path()
+            service: str = str(data.get("service", "skills"))
+            path: Optional[str] = log_path(directory, service)
+            if path is None:
+                send(
+                    self,
+                    f'{MSG_TYPE["logs"]}.answer',
+                    data={
+                        "error": "no log file found",
+                        "services": log_files(directory),
+                    },
+                    message=message,
+                )
+                return
+
+            rotated: bool = False
+            try:
+                match = matcher(data.get("level"), data.get("pattern"))
+                count: int = max(
+                    1, min(int(data.get("lines", LOGS_LINES)), LOGS_MAX_LINES)
+                )
+                if data.get("offset") is None:
+                    lines, offset, size = tail(path, count, match, LOGS_MAX_SCAN)
+                else:
+                    lines, offset, size, rotated = follow(
+                        path, int(data["offset"]), count, match
+                    )
+            except (TypeError, ValueError) as err:
+                send(
+                    self,
+                    f'{MSG_TYPE["logs"]}.answer',
+                    data={"error": str(err)},
+                    message=message,
+                )
+                return
+            except OSError as err:
+                LOG.error(f"unable to read {path}")
+                LOG.debug(err)
+                send(
+                    self,
+                    f'{MSG_TYPE["logs"]}.answer',
+                    data={"error": "unable to read the log file"},
+                    message=message,
+                )
+                return
+
+            answer: dict = {
+                "service": service,
+                "offset": offset,
+                "size": size,
+                "rotated": rotated,
+                "chunks": 0,
+                "lines": [line for _, line in lines],
+            }
+            if len(lines) > LOGS_CHUNK_LINES:
+                chunks: int = -(-len(lines) // LOGS_CHUNK_LINES)
+                for index in range(chunks):
+                    chunk: list = lines[
+                        index * LOGS_CHUNK_LINES : (index + 1) * LOGS_CHUNK_LINES
+                    ]
+                    send(
+                        self,
+                        f'{MSG_TYPE["logs"]}.chunk',
+                        data={
+                            "service": service,
+                            "index": index,
+                            "chunks": chunks,
+                            "offset": chunk[-1][0],
+                            "lines": [line for _, line in chunk],
+                        },
+                        message=message,
+                    )
+                answer.update(chunks=chunks, lines=[])
+            send(self, f'{MSG_TYPE["logs"]}.answer', data=answer, message=message)
+
+    def _handle_system_stats(self, message: Message) -> None:
+        """When ovos.api.system.stats event is detected on the bus, this
+        function will send the last CPU, memory, load average and OVOS
+        process RSS sample with their history.
+
+        The values are sampled in the background, the history is averaged
+        down to the number of points requested by the client.
+        """
+        if check_auth(self, message):
+            current: Optional[dict] = self.sampler.current()
+            if current is None:
+                data: dict = {"error": "system statistics unavailable"}
+            else:
+                try:
+                    points: int = int(message.data.get("points", SYSTEM_STATS_POINTS))
+                except (TypeError, ValueError):
+                    points = SYSTEM_STATS_POINTS
+                data = {
+                    "interval": self.sampler.interval,
+                    "current": current,
+                    "history": self.sampler.history(points),
+                }
+            send(
+                self,
+                f'{MSG_TYPE["system_stats"]}.answer',
+                data=data,
+                message=message,
             )
 
+    def _handle_utterance(self, message: Message) -> None:
+        """When ovos.api.utterance event is detected on the bus, this
+        function will inject a batch of utterances as
+        recognizer_loop:utterance messages to drive the intent pipeline
+        without any voice interaction.
+
+        The utterances are injected at the requested rate (per second) or
+        one after the other, the speak and intent responses are correlated
+        to each utterance. The answer with the per-utterance latencies and
+        the summary of the outcomes is sent once every utterance has been
+        handled or timed out.
+        """
+        if check_auth(self, message):
+            data: dict = message.data
+            utterances = data.get("utterances")
+            try:
+                if (
+                    not isinstance(utterances, list)
+                    or not utterances
+                    or len(utterances) > UTTERANCE_MAX_BATCH
+                    or not all(isinstance(utterance, str) for utterance in utterances)
+                ):
+                    raise ValueError(
+                        f"utterances must be a list of 1 to {UTTERANCE_MAX_BATCH} strings"
+                    )
+                rate: float = min(float(data.get("rate") or 0), UTTERANCE_MAX_RATE)
+                timeout: float = min(
+                    float(data.get("timeout", UTTERANCE_TIMEOUT)), UTTERANCE_MAX_TIMEOUT
+                )
+                if rate < 0 or timeout <= 0:
+                    raise ValueError("rate and timeout must be positive")
+            except (TypeError, ValueError) as err:
+                send(
+                    self,
+                    f'{MSG_TYPE["utterance"]}.answer',
+                    data={"error": str(err)},
+                    message=message,
+                )
+                return
+
+            if not self.injector.acquire(len(utterances), rate, timeout):
+                self._busy(message, self.injector.retry_after())
+                return
+            try:
+                self.utterance_executor.submit(
+                    self._utterance_job,
+                    message,
+                    utterances,
+                    data.get("lang", self.lang),
+                    rate,
+                    timeout,
+                )
+            except RuntimeError as err:
+                LOG.debug(f"unable to queue the utterances injection: {err}")
+                self.injector.release()
+
+    def _utterance_job(
+        self,
+        message: Message,
+        utterances: List[str],
+        lang: str,
+        rate: float,
+        timeout: float,
+    ) -> None:
+        """Run an utterances injection and send its report as
+        ovos.api.utterance answer.
+        """
+        try:
+            data: dict = self.injector.run(
+                utterances,
+                lang,
+                rate,
+                timeout,
+                context={
+                    "source": "rest_api",
+                    "destination": ["skills"],
+                    **correlation(message),
+                },
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            LOG.error("unable to inject the utterances")
+            LOG.debug(err)
+            data = {"error": "unable to inject the utterances"}
+        send(self, f'{MSG_TYPE["utterance"]}.answer', data=data, message=message)
+
+    def _logs_path(self) -> str:
+        """Return the directory of the OVOS log files."""
+        config: dict = configuration()
+        path: Optional[str] = config.get("logging", {}).get("logs", {}).get("path")
+        return str(Path(path).expanduser()) if path else f"{Path.home()}/{LOGS_DIR}"
+
+    def _tts_cache_path(self) -> Tuple[str, str, str]:
+        """Return the cache directory of the configured TTS module with the
+        voice and language used.
+        """
+        config: dict = configuration()
+        lang: str = config["lang"]
+        tts_module: str = config["tts"]["module"]
+        tts_voice: str = config["tts"][tts_module]["voice"]
+        return f"{Path.home()}/{TTS_CACHE_DIR}/{tts_module}", tts_voice, lang
+
+    def _prune_job(
+        self,
+        message: Message,
+        max_bytes: Optional[int],
+        max_age: Optional[float],
+        rank_by: str,
+    ) -> None:
+        """Prune the TTS cache and send the report as ovos.api.cache answer."""
+        answer: dict = {"cache_type": "tts", "action": "prune", "status": False}
+        try:
+            tts_path: str = self._tts_cache_path()[0]
+            answer.update(
+                prune(
+                    tts_path,
+                    max_bytes=max_bytes,
+                    max_age=max_age,
+                    rank_by=rank_by,
+                ),
+                status=True,
+            )
+        except (IOError, KeyError) as err:
+            LOG.error("unable to prune tts cache")
+            LOG.debug(err)
+        send(self, f'{MSG_TYPE["cache"]}.answer', data=answer, message=message)
+
+    def _handle_auto_prune(self, _: Message) -> None:
+        """Scheduled pruning of the TTS cache based on the skill settings."""
+        max_size: float = self._setting("tts_cache_max_size", 0)
+        try:
+            tts_path: str = self._tts_cache_path()[0]
+        except KeyError as err:
+            LOG.debug(err)
+            return
+        self.cache_executor.submit(prune, tts_path, max_bytes=int(max_size * 1048576))
+
+    def _purge_job(self, message: Message, job_id: str, trash: Optional[str]) -> None:
+        """Delete a renamed TTS cache tree and report the progress on the
+        bus.
+        """
+        files: int = 0
+        freed: int = 0
+        if trash:
+            files, freed = remove_tree(
+                trash,
+                lambda files, freed: send(
+                    self,
+                    MSG_TYPE["cache_progress"],
+                    data={"job_id": job_id, "files": files, "bytes": freed},
+                    message=message,
+                ),
+            )
+        LOG.debug(f"tts cache purge {job_id} freed {freed} bytes")
+        self.subscriptions.publish(
+            "cache", {"job_id": job_id, "files": files, "bytes": freed}
+        )
+        send(
+            self,
+            MSG_TYPE["cache_complete"],
+            data={"job_id": job_id, "files": files, "bytes": freed},
+            message=message,
+        )
+
     # def _handle_skill_install(self, message: dict) -> None:
     #     """When mycroft.api.skill_install event is detected on the bus,
     #     this function install a skill based on the Git repository provided.
     #     """
     #     self.log.debug("mycroft.api.skill_install message detected")
-    #     check_auth(self, message)
-    #     if self.authenticated:
+    #     if check_auth(self, message):
     #         skill: str = message.data.get("skill")
     #         confirm: bool = message.data.get("confirm")
     #         try:
@@ -286,8 +1182,7 @@ class RestApiSkill(OVOSSkill):
     #     this function uninstall a skill based on the skill ID.
     #     """
     #     self.log.debug("mycroft.api.skill_uninstall message detected")
-    #     check_auth(self, message)
-    #     if self.authenticated:
+    #     if check_auth(self, message):
     #         skill: str = message.data.get("skill")
     #         confirm: bool = message.data.get("confirm")
     #         try:
@@ -320,8 +1215,57 @@ class RestApiSkill(OVOSSkill):
         any final setup for the Skill including accessing Skill settings.
         https://openvoiceos.github.io/ovos-technical-manual/skill_structure/#initialize
         """
-        self.authenticated: bool = False
         self.configured: bool = False
+        self.api_digest: Optional[bytes] = None
+        self.encoding_threshold: int = ENCODING_THRESHOLD
+        self.limiter: RateLimiter = RateLimiter(RATE_LIMIT, RATE_LIMIT_BURST)
+        self.auth_limiter: RateLimiter = RateLimiter(
+            AUTH_FAILURE_RATE, AUTH_FAILURE_BURST
+        )
+        self.info: Optional[dict] = None
+        self.info_stats: dict = {"hits": 0, "rebuilds": 0}
+        self.metrics: Metrics = Metrics(LATENCY_BUCKETS, PAYLOAD_SAMPLE_RATE)
+        self.config_hash: Optional[str] = None
+        self.handlers: Dict[str, Callable] = {}
+        self.singleflight: SingleFlight = SingleFlight()
+        self.settings_cache: SettingsCache = SettingsCache(max_size=SETTINGS_CACHE_SIZE)
+        self.subscriptions: Subscriptions = Subscriptions(
+            self._emit_event, SUBSCRIPTION_WINDOW
+        )
+        self.prober: ConnectivityProber = ConnectivityProber()
+        self.prober.on_change = lambda state: self.subscriptions.publish(
+            "internet", {"status": state["status"]}
+        )
+        self.sampler: SystemSampler = SystemSampler(
+            SYSTEM_STATS_INTERVAL, SYSTEM_STATS_SIZE
+        )
+        self.awake: AwakeState = AwakeState(
+            SLEEP_MARK, persist=as_bool(self.settings.get("persist_sleep_state", True))
+        )
+        self.awake.restore()
+        self.cache_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="rest-api-cache"
+        )
+        self.injector: UtteranceInjector = UtteranceInjector(self.bus.emit)
+        self.utterance_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="rest-api-utterance"
+        )
+        self.cache_stats: CacheStats = CacheStats(f"{Path.home()}/{TTS_CACHE_DIR}")
+        for trash in stale_trashes(f"{Path.home()}/{TTS_CACHE_DIR}"):
+            self.cache_executor.submit(remove_tree, trash)
+        self.dispatcher: Dispatcher = Dispatcher(WORKER_POOL_SIZE, WORKER_QUEUE_DEPTH)
+        self.metrics.sources["caches"] = lambda: {
+            "info": dict(self.info_stats),
+            "skill_settings": {
+                "hits": self.settings_cache.hits,
+                "misses": self.settings_cache.misses,
+            },
+        }
+
+        self.add_event(CONFIG_UPDATED, self._handle_config_updated)
+        for msg_type in RESPONSES:
+            self.add_event(msg_type, self.injector.on_response)
+        self._register()
 
         self.settings_change_callback = self.on_settings_changed
         self.on_settings_changed()
@@ -331,4 +1275,25 @@ class RestApiSkill(OVOSSkill):
         regularly, and write these to the skill's settings.json.
         https://openvoiceos.github.io/ovos-technical-manual/skill_settings
         """
+        self.info = None
+        self.config_hash = None
+        self.singleflight.clear()
         self._setup()
+        try:
+            self._get_info()
+        except KeyError as err:
+            LOG.error("unable to build the info snapshot")
+            LOG.debug(err)
+
+    def shutdown(self) -> None:
+        """Stop the background threads started by the skill before it is
+        unloaded.
+        """
+        self.prober.stop()
+        self.sampler.stop()
+        self.dispatcher.shutdown()
+        self.subscriptions.cancel()
+        self.cache_executor.shutdown(wait=False)
+        self.injector.cancel()
+        self.utterance_executor.shutdown(wait=False)
+        self.settings_cache.unwatch()
@@ -0,0 +1,112 @@
+"""In-memory sleep/awake state of the instance
+"""
+
+import time
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Optional
+from ovos_utils.log import LOG
+
+
+class AwakeState:
+    """Keep track of the sleep/awake state from the recognizer_loop events.
+
+    The state lives in memory, the sleep mark file is only used as an
+    optional write-behind persistence layer which is read once at startup
+    to restore the state after a restart.
+    """
+
+    def __init__(self, mark: str, persist: bool = True) -> None:
+        self.mark: str = mark
+        self.persist: bool = persist
+        self.is_awake: bool = True
+        self.changed_at: float = time.time()
+        self.last_sleep: Optional[float] = None
+        self.last_wake_up: Optional[float] = None
+        self._lock: Lock = Lock()
+        self._dirty: Event = Event()
+        self._writer: Optional[Thread] = None
+
+    def restore(self) -> None:
+        """Restore the state from the sleep mark left by a previous run,
+        the mark is ignored when the state is not persisted.
+        """
+        if not self.persist:
+            return
+        try:
+            stat = Path(self.mark).stat()
+        except FileNotFoundError:
+            return
+        except OSError as err:
+            LOG.error("unable to retrieve sleep mark")
+            LOG.debug(err)
+            return
+        with self._lock:
+            self.is_awake = False
+            self.changed_at = self.last_sleep = stat.st_mtime
+        LOG.debug("sleep state restored from the sleep mark")
+
+    def sleep(self) -> bool:
+        """Switch to sleep mode, return True when the state changed."""
+        return self._transition(False)
+
+    def wake_up(self) -> bool:
+        """Switch to awake mode, return True when the state changed."""
+        return self._transition(True)
+
+    def state(self) -> dict:
+        """Current state, transition timestamps and time spent in the
+        current state in seconds.
+        """
+        with self._lock:
+            return {
+                "is_awake": self.is_awake,
+                "changed_at": self.changed_at,
+                "last_sleep": self.last_sleep,
+                "last_wake_up": self.last_wake_up,
+                "duration": round(time.time() - self.changed_at, 3),
+            }
+
+    def _transition(self, is_awake: bool) -> bool:
+        """Apply a transition and schedule the sleep mark update."""
+        now: float = time.time()
+        with self._lock:
+            if is_awake:
+                self.last_wake_up = now
+            else:
+                self.last_sleep = now
+            if self.is_awake == is_awake:
+                return False
+            self.is_awake = is_awake
+            self.changed_at = now
+        if self.persist:
+            self._schedule_write()
+        return True
+
+    def _schedule_write(self) -> None:
+        """Wake up the writer thread, several transitions happening before
+        it runs result in a single write.
+        """
+        with self._lock:
+            if self._writer is None:
+                self._writer = Thread(
+                    target=self._write, name="rest-api-sleep-mark", daemon=True
+                )
+                self._writer.start()
+        self._dirty.set()
+
+    def _write(self) -> None:
+        """Reflect the current state on the sleep mark file each time a
+        transition happens.
+        """
+        while True:
+            self._dirty.wait()
+            self._dirty.clear()
+            try:
+                if self.is_awake:
+                    Path(self.mark).unlink(missing_ok=True)
+                else:
+                    Path(self.mark).touch()
+            except OSError as err:
+                LOG.error("unable to update the sleep mark")
+                LOG.debug(err)
@@ -0,0 +1,229 @@
+"""Functions used to manage the TTS cache
+"""
+
+import os
+import time
+from glob import glob
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+from ovos_utils.log import LOG
+
+TRASH_SUFFIX = "purge"
+RANK_BY = ("atime", "mtime")
+
+
+def purge(tts_path: str, voice: str, lang: str, job_id: str) -> Optional[str]:
+    """Atomically move the TTS cache aside and recreate an empty
+    <voice>/<lang> layout.
+
+    The renamed tree has to be deleted with remove_tree(), its path is
+    returned or None when there was no cache to move.
+    """
+    trash: Optional[str] = f"{tts_path}.{job_id}.{TRASH_SUFFIX}"
+    try:
+        os.rename(tts_path, trash)
+    except FileNotFoundError:
+        trash = None
+    Path(f"{tts_path}/{voice}/{lang}").mkdir(parents=True, exist_ok=True)
+    return trash
+
+
+def stale_trashes(tts_dir: str) -> List[str]:
+    """List the renamed trees left behind by an interrupted purge."""
+    return glob(f"{tts_dir}/*.*.{TRASH_SUFFIX}")
+
+
+def remove_tree(
+    directory: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+    interval: float = 1.0,
+) -> Tuple[int, int]:
+    """Delete a directory tree without recursion and return the number of
+    files and bytes freed.
+
+    The progress callback is called with the running totals at most once
+    per interval seconds.
+    """
+    files: int = 0
+    freed: int = 0
+    reported: float = time.monotonic()
+    stack: List[Tuple[str, bool]] = [(directory, False)]
+    while stack:
+        path, scanned = stack.pop()
+        if scanned:
+            try:
+                os.rmdir(path)
+            except OSError as err:
+                LOG.debug(f"unable to remove {path} directory: {err}")
+            continue
+
+        stack.append((path, True))
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, False))
+                        continue
+                    try:
+                        size: int = entry.stat(follow_symlinks=False).st_size
+                        os.unlink(entry.path)
+                    except OSError as err:
+                        LOG.debug(f"unable to remove {entry.path} file: {err}")
+                        continue
+                    files += 1
+                    freed += size
+                    if progress and time.monotonic() - reported >= interval:
+                        reported = time.monotonic()
+                        progress(files, freed)
+        except OSError as err:
+            LOG.debug(f"unable to scan {path} directory: {err}")
+    return files, freed
+
+
+def prune(
+    directory: str,
+    max_bytes: Optional[int] = None,
+    max_age: Optional[float] = None,
+    rank_by: str = "atime",
+) -> dict:
+    """Evict the coldest files of a cache directory until it fits within
+    max_bytes, files not used for more than max_age seconds are evicted
+    whatever the budget.
+
+    Files are ranked by access time or modification time depending on
+    rank_by, the directories are kept in place. ValueError is raised when
+    rank_by is unknown.
+    """
+    if rank_by not in RANK_BY:
+        raise ValueError(f"rank_by must be one of {', '.join(RANK_BY)}")
+    entries: List[Tuple[float, int, str]] = []
+    stack: List[str] = [directory]
+    while stack:
+        path: str = stack.pop()
+        try:
+            with os.scandir(path) as scan:
+                for entry in scan:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    try:
+                        stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    used: float = stat.st_mtime if rank_by == "mtime" else stat.st_atime
+                    entries.append((used, stat.st_size, entry.path))
+        except OSError as err:
+            LOG.debug(f"unable to scan {path} directory: {err}")
+
+    entries.sort()
+    total: int = sum(size for _, size, _ in entries)
+    cutoff: Optional[float] = time.time() - max_age if max_age else None
+    evicted_files: int = 0
+    evicted_bytes: int = 0
+    for used, size, path in entries:
+        expired: bool = cutoff is not None and used < cutoff
+        over: bool = max_bytes is not None and total > max_bytes
+        if not expired and not over:
+            break
+        try:
+            os.unlink(path)
+        except OSError as err:
+            LOG.debug(f"unable to remove {path} file: {err}")
+            continue
+        total -= size
+        evicted_files += 1
+        evicted_bytes += size
+
+    return {
+        "kept": {"files": len(entries) - evicted_files, "bytes": total},
+        "evicted": {"files": evicted_files, "bytes": evicted_bytes},
+    }
+
+
+class CacheStats:
+    """Incremental size accounting of the TTS cache directory.
+
+    The summary of each directory is kept with its mtime, only the
+    directories whose mtime changed since the previous call are scanned
+    again. Files rewritten in place don't change the directory mtime and
+    are therefore only accounted on the next change of their directory.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory: str = directory
+        self._dirs: Dict[str, Tuple[int, dict, List[str]]] = {}
+        self._lock: Lock = Lock()
+
+    def stats(self) -> dict:
+        """Return the file count, total bytes and the oldest and newest
+        entries per TTS module, voice and language.
+        """
+        groups: Dict[str, dict] = {}
+        total: dict = _summary()
+        with self._lock:
+            seen: Dict[str, Tuple[int, dict, List[str]]] = {}
+            stack: List[str] = [self.directory]
+            while stack:
+                path: str = stack.pop()
+                scanned = self._scan(path)
+                if scanned is None:
+                    continue
+                seen[path] = scanned
+                _, files, subdirs = scanned
+                stack.extend(subdirs)
+                if files["files"]:
+                    relative: str = os.path.relpath(path, self.directory)
+                    key: str = "/".join(relative.split(os.sep)[:3])
+                    _merge(groups.setdefault(key, _summary()), files)
+                    _merge(total, files)
+            self._dirs = seen
+        return {"total": total, "entries": groups}
+
+    def _scan(self, path: str) -> Optional[Tuple[int, dict, List[str]]]:
+        """Return the mtime, the files summary and the sub-directories of a
+        directory, from the previous scan when its mtime didn't change.
+        """
+        try:
+            mtime: int = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._dirs.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached
+
+        files: dict = _summary()
+        subdirs: List[str] = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if path != self.directory or not entry.name.endswith(
+                            f".{TRASH_SUFFIX}"
+                        ):
+                            subdirs.append(entry.path)
+                        continue
+                    try:
+                        stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    _merge(files, _summary(1, stat.st_size, stat.st_mtime))
+        except OSError as err:
+            LOG.debug(f"unable to scan {path} directory: {err}")
+        return mtime, files, subdirs
+
+
+def _summary(files: int = 0, size: int = 0, mtime: Optional[float] = None) -> dict:
+    """Build a stats summary, empty by default."""
+    return {"files": files, "bytes": size, "oldest": mtime, "newest": mtime}
+
+
+def _merge(summary: dict, other: dict) -> None:
+    """Merge a stats summary into another one."""
+    summary["files"] += other["files"]
+    summary["bytes"] += other["bytes"]
+    if other["oldest"] is not None:
+        if summary["oldest"] is None or other["oldest"] < summary["oldest"]:
+            summary["oldest"] = other["oldest"]
+        if summary["newest"] is None or other["newest"] > summary["newest"]:
+            summary["newest"] = other["newest"]
@@ -3,12 +3,23 @@
 
 MSG_PREFIX = "ovos.api"
 MSG_TYPE = {
+    "batch": f"{MSG_PREFIX}.batch",
     "cache": f"{MSG_PREFIX}.cache",
+    "cache_complete": f"{MSG_PREFIX}.cache.complete",
+    "cache_progress": f"{MSG_PREFIX}.cache.progress",
+    "cache_stats": f"{MSG_PREFIX}.cache.stats",
     "internet": f"{MSG_PREFIX}.internet",
     "config": f"{MSG_PREFIX}.config",
+    "event": f"{MSG_PREFIX}.event",
     "info": f"{MSG_PREFIX}.info",
     "is_awake": f"{MSG_PREFIX}.is_awake",
+    "logs": f"{MSG_PREFIX}.logs",
+    "metrics": f"{MSG_PREFIX}.metrics",
     "skill_settings": f"{MSG_PREFIX}.skill_settings",
+    "subscribe": f"{MSG_PREFIX}.subscribe",
+    "system_stats": f"{MSG_PREFIX}.system.stats",
+    "unsubscribe": f"{MSG_PREFIX}.unsubscribe",
+    "utterance": f"{MSG_PREFIX}.utterance",
     # "skill_install": f"{MSG_PREFIX}.skill_install",
     # "skill_uninstall": f"{MSG_PREFIX}.skill_uninstall",
     "sleep": "recognizer_loop:sleep",
@@ -18,7 +29,57 @@ MSG_TYPE = {
     "wake_up_answer": f"{MSG_PREFIX}.wake_up",
     "websocket": f"{MSG_PREFIX}.websocket",
 }
+CONFIG_UPDATED = "configuration.updated"
 SKILLS_CONFIG_DIR = ".config/mycroft/skills"
 # TMP_DIR = "/tmp/mycroft"
 TTS_CACHE_DIR = ".cache/mycroft"
 SLEEP_MARK = "/tmp/sleep.mark"
+SUBSCRIPTION_WINDOW = 0.5
+RATE_LIMIT = 20
+RATE_LIMIT_BURST = 40
+AUTH_FAILURE_RATE = 0.2
+AUTH_FAILURE_BURST = 10
+WORKER_POOL_SIZE = 4
+WORKER_QUEUE_DEPTH = 8
+BATCH_MAX_REQUESTS = 32
+SLOW_HANDLERS = (
+    "batch",
+    "cache",
+    "cache_stats",
+    "config",
+    "logs",
+    "skill_settings",
+)
+PROBE_INTERVAL = 60
+PROBE_MAX_BACKOFF = 600
+SETTINGS_CACHE_SIZE = 64
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+PAYLOAD_SAMPLE_RATE = 16
+SYSTEM_STATS_INTERVAL = 5
+SYSTEM_STATS_SIZE = 720
+SYSTEM_STATS_POINTS = 60
+UTTERANCE_MAX_BATCH = 100
+UTTERANCE_MAX_RATE = 50
+UTTERANCE_TIMEOUT = 10
+UTTERANCE_MAX_TIMEOUT = 60
+LOGS_DIR = ".local/state/mycroft"
+LOGS_LINES = 100
+LOGS_MAX_LINES = 5000
+LOGS_CHUNK_LINES = 200
+LOGS_MAX_SCAN = 16 * 1024 * 1024
+ENCODING_THRESHOLD = 4096
+AUTO_PRUNE_EVENT = "rest-api-tts-cache-prune"
@@ -0,0 +1,113 @@
+"""Bounded worker pool used to run the slow bus handlers
+"""
+
+import math
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import wraps
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+from ovos_bus_client.message import Message
+from ovos_utils.log import LOG
+
+
+class Dispatcher:
+    """Run the slow handlers on a bounded thread pool so they don't delay
+    the fast ones running on the bus thread.
+
+    The number of pending calls is limited per message type, when the limit
+    is reached the message is rejected and the on_busy callback is called
+    with a retry-after hint based on the average duration of the calls.
+    """
+
+    def __init__(self, workers: int = 4, queue_depth: int = 8) -> None:
+        self.workers: int = workers
+        self.queue_depth: int = queue_depth
+        self.executor: ThreadPoolExecutor = self._executor(workers)
+        self._pending: Dict[str, int] = {}
+        self._durations: Dict[str, float] = {}
+        self._lock: Lock = Lock()
+
+    @staticmethod
+    def _executor(workers: int) -> ThreadPoolExecutor:
+        """Create the thread pool."""
+        return ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="rest-api-worker"
+        )
+
+    def resize(self, workers: int, queue_depth: int) -> None:
+        """Apply a new pool size and queue depth, the pending calls are
+        completed by the previous pool.
+        """
+        self.queue_depth = queue_depth
+        if workers != self.workers:
+            previous: ThreadPoolExecutor = self.executor
+            self.workers = workers
+            self.executor = self._executor(workers)
+            previous.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        """Stop the thread pool, pending calls are cancelled."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def retry_after(self, name: str) -> float:
+        """Estimate in seconds when a new call could be accepted."""
+        with self._lock:
+            pending: int = self._pending.get(name, 0)
+            duration: float = self._durations.get(name, 0.1)
+        return round(duration * math.ceil(pending / self.workers), 3)
+
+    def submit(self, name: str, func: Callable, *args) -> Optional[Future]:
+        """Queue a call and return its future, None is returned when the
+        queue of name is full.
+        """
+        with self._lock:
+            if self._pending.get(name, 0) >= self.queue_depth:
+                return None
+            self._pending[name] = self._pending.get(name, 0) + 1
+        try:
+            future: Future = self.executor.submit(self._run, name, func, *args)
+        except RuntimeError as err:
+            LOG.debug(f"unable to queue {name}: {err}")
+            self._release(name)
+            return None
+        future.add_done_callback(lambda _: self._release(name))
+        return future
+
+    def wrap(
+        self,
+        name: str,
+        handler: Callable[[Message], None],
+        on_busy: Callable[[Message, float], None],
+    ) -> Callable:
+        """Wrap a bus handler to run it on the thread pool."""
+
+        @wraps(handler)
+        def wrapper(message: Message) -> None:
+            if self.submit(name, handler, message) is None:
+                LOG.debug(f"{name} queue is full, rejecting the message")
+                on_busy(message, self.retry_after(name))
+
+        return wrapper
+
+    def _run(self, name: str, func: Callable, *args) -> Any:
+        """Run a call and update the average call duration, its errors are
+        logged as the bus handlers don't wait for their future.
+        """
+        start: float = time.monotonic()
+        try:
+            return func(*args)
+        except Exception as err:
+            LOG.error(f"unable to process {name}")
+            LOG.debug(err)
+            raise
+        finally:
+            duration: float = time.monotonic() - start
+            with self._lock:
+                average: float = self._durations.get(name, duration)
+                self._durations[name] = 0.8 * average + 0.2 * duration
+
+    def _release(self, name: str) -> None:
+        """Release the queue slot of a completed call."""
+        with self._lock:
+            self._pending[name] -= 1
@@ -0,0 +1,76 @@
+"""Compact encodings of the answer payloads
+"""
+
+import json
+import zlib
+from base64 import b64encode
+from functools import lru_cache
+from types import ModuleType
+from typing import Optional, Tuple
+from ovos_utils.log import LOG
+
+COMPRESSIONS = ("zlib",)
+SERIALIZERS = ("json", "msgpack")
+
+
+@lru_cache(maxsize=None)
+def _msgpack() -> Optional[ModuleType]:
+    """Return the msgpack module, None when it is not installed. It is
+    only imported on first use to keep it out of the skill load path.
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def negotiate(encoding: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse an encoding requested by a client such as zlib+json, msgpack
+    or zlib+msgpack.
+
+    The serializer comes last and could be preceded by a compression, None
+    is returned when plain JSON should be used because the encoding is not
+    requested, unknown or msgpack is not installed.
+    """
+    if not encoding or encoding == "json":
+        return None
+    parts: Tuple[str, ...] = tuple(str(encoding).lower().split("+"))
+    if parts[-1] not in SERIALIZERS or any(
+        part not in COMPRESSIONS for part in parts[:-1]
+    ):
+        LOG.debug(f"unsupported encoding {encoding}, falling back to json")
+        return None
+    if parts[-1] == "msgpack" and _msgpack() is None:
+        LOG.debug("msgpack is not installed, falling back to json")
+        return None
+    return parts
+
+
+def encode(
+    data: dict, encoding: Optional[str], threshold: int, level: int = 6
+) -> Optional[Tuple[dict, dict]]:
+    """Encode an answer payload using the encoding requested by a client.
+
+    The base64 encoded payload is returned with the context describing the
+    encoding and the size of the JSON payload. None is returned when the
+    answer should be sent as plain JSON because no supported encoding is
+    requested or because the JSON payload is smaller than threshold bytes.
+    """
+    parts: Optional[Tuple[str, ...]] = negotiate(encoding)
+    if parts is None:
+        return None
+
+    raw: bytes = json.dumps(data, default=str).encode("utf-8")
+    size: int = len(raw)
+    if size < threshold:
+        return None
+    if parts[-1] == "msgpack":
+        raw = _msgpack().packb(data, default=str)
+    if "zlib" in parts:
+        raw = zlib.compress(raw, level)
+    return {"payload": b64encode(raw).decode("ascii")}, {
+        "encoding": "+".join(parts),
+        "size": size,
+    }
@@ -0,0 +1,177 @@
+"""Utterances injection used to load test the intent pipeline
+"""
+
+import time
+from threading import Event, Lock
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+from ovos_bus_client.message import Message
+
+CORRELATION_KEY = "rest_api_utterance"
+UTTERANCE = "recognizer_loop:utterance"
+INTENT_START = "mycroft.skill.handler.start"
+INTENT_COMPLETE = "mycroft.skill.handler.complete"
+INTENT_FAILURE = "complete_intent_failure"
+SPEAK = "speak"
+HANDLED = "ovos.utterance.handled"
+RESPONSES = (INTENT_START, INTENT_COMPLETE, INTENT_FAILURE, SPEAK, HANDLED)
+
+
+class UtteranceInjector:
+    """Inject utterances on the bus and correlate the responses of the
+    intent pipeline to measure their end-to-end latency.
+
+    Each injected utterance carries a correlation id in its context, the
+    intent service and the skills forward the context so their responses
+    could be matched. Only one run is allowed at a time to not skew the
+    measurements.
+    """
+
+    def __init__(self, emit: Callable[[Message], None]) -> None:
+        self._emit: Callable[[Message], None] = emit
+        self._pending: Dict[str, dict] = {}
+        self._lock: Lock = Lock()
+        self._running: Lock = Lock()
+        self._deadline: float = 0.0
+
+    def acquire(self, count: int, rate: float, timeout: float) -> bool:
+        """Reserve the injector for a run, return False when a run is
+        already in progress. The run releases it once completed.
+        """
+        if not self._running.acquire(blocking=False):
+            return False
+        duration: float = count / rate if rate else count * timeout
+        self._deadline = time.monotonic() + duration + timeout
+        return True
+
+    def release(self) -> None:
+        """Release the injector reserved for a run."""
+        self._running.release()
+
+    def retry_after(self) -> float:
+        """Estimate in seconds when the run in progress will be completed."""
+        return round(max(0.0, self._deadline - time.monotonic()), 3)
+
+    def cancel(self) -> None:
+        """Stop waiting for the responses of the run in progress."""
+        with self._lock:
+            for record in self._pending.values():
+                record["done"].set()
+
+    def on_response(self, message: Message) -> None:
+        """Record a response of the intent pipeline to an injected
+        utterance, the other messages are ignored.
+        """
+        injection: Optional[str] = message.context.get(CORRELATION_KEY)
+        if injection is None:
+            return
+        with self._lock:
+            record: Optional[dict] = self._pending.get(injection)
+            if record is None or record["done"].is_set():
+                return
+            elapsed: float = round(time.monotonic() - record["start"], 4)
+            if message.msg_type == INTENT_START:
+                record.setdefault("intent_latency", elapsed)
+                record["handler"] = message.data.get("name")
+            elif message.msg_type == SPEAK:
+                record.setdefault("speak_latency", elapsed)
+                record["speak"].append(message.data.get("utterance"))
+            else:
+                record["outcome"] = (
+                    "failure" if message.msg_type == INTENT_FAILURE else "handled"
+                )
+                record["latency"] = elapsed
+                record["done"].set()
+
+    def run(
+        self,
+        utterances: List[str],
+        lang: str,
+        rate: float = 0.0,
+        timeout: float = 10.0,
+        context: Optional[dict] = None,
+    ) -> dict:
+        """Inject the utterances and wait for their responses.
+
+        With a rate, the utterances are injected at rate utterances per
+        second without waiting for the previous ones to be handled,
+        otherwise each utterance is injected once the previous one has
+        been handled or timed out. The injector must be acquired first.
+        """
+        records: List[Tuple[str, dict]] = []
+        started: float = time.monotonic()
+        try:
+            for index, utterance in enumerate(utterances):
+                if rate:
+                    delay: float = started + index / rate - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                injection: str = uuid4().hex
+                record: dict = {
+                    "utterance": utterance,
+                    "outcome": "timeout",
+                    "speak": [],
+                    "done": Event(),
+                    "start": time.monotonic(),
+                }
+                with self._lock:
+                    self._pending[injection] = record
+                records.append((injection, record))
+                self._emit(
+                    Message(
+                        UTTERANCE,
+                        data={"utterances": [utterance], "lang": lang},
+                        context={**(context or {}), CORRELATION_KEY: injection},
+                    )
+                )
+                if not rate:
+                    record["done"].wait(timeout)
+
+            for injection, record in records:
+                record["done"].wait(
+                    max(0.0, record["start"] + timeout - time.monotonic())
+                )
+        finally:
+            with self._lock:
+                for injection, record in records:
+                    self._pending.pop(injection, None)
+            self.release()
+
+        duration: float = time.monotonic() - started
+        results: List[dict] = [
+            {
+                key: value
+                for key, value in record.items()
+                if key not in ("done", "start")
+            }
+            for _, record in records
+        ]
+        return {"results": results, "summary": summary(results, duration)}
+
+
+def summary(results: List[dict], duration: float) -> dict:
+    """Summarize the outcomes and the latencies of a run."""
+    outcomes: Dict[str, int] = {"handled": 0, "failure": 0, "timeout": 0}
+    for result in results:
+        outcomes[result["outcome"]] += 1
+    latencies: List[float] = sorted(
+        result["latency"] for result in results if "latency" in result
+    )
+
+    def percentile(quantile: float) -> Optional[float]:
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+
+    return {
+        "count": len(results),
+        **outcomes,
+        "duration": round(duration, 3),
+        "throughput": round(len(results) / duration, 3) if duration else None,
+        "latency": {
+            "mean": round(sum(latencies) / len(latencies), 4) if latencies else None,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "max": latencies[-1] if latencies else None,
+        },
+    }
@@ -0,0 +1,190 @@
+"""Memory-mapped reading of the OVOS log files
+"""
+
+import mmap
+import os
+import re
+from glob import glob
+from typing import Callable, Iterator, List, Optional, Tuple
+
+LEVELS = {
+    "DEBUG": 10,
+    "INFO": 20,
+    "WARNING": 30,
+    "ERROR": 40,
+    "EXCEPTION": 40,
+    "CRITICAL": 50,
+}
+LEVEL_PATTERN = re.compile(r" - (DEBUG|INFO|WARNING|ERROR|EXCEPTION|CRITICAL) - ")
+SERVICE_PATTERN = re.compile(r"^[\w.-]+$")
+
+# A record is a log line with its continuation lines (i.e. a traceback),
+# each line comes with the offset right after its newline.
+Record = List[Tuple[int, str]]
+
+
+def log_files(directory: str) -> List[str]:
+    """List the services having a log file in directory."""
+    return sorted(
+        os.path.basename(path)[: -len(".log")] for path in glob(f"{directory}/*.log")
+    )
+
+
+def log_path(directory: str, service: str) -> Optional[str]:
+    """Return the log file of a service, None when the service name is
+    invalid or when it has no log file.
+    """
+    if not SERVICE_PATTERN.match(service) or service.startswith("."):
+        return None
+    path: str = f"{directory}/{service}.log"
+    return path if os.path.isfile(path) else None
+
+
+def matcher(
+    level: Optional[str] = None, pattern: Optional[str] = None
+) -> Optional[Callable[[Record], bool]]:
+    """Build the filter of the records, a record matches when its level is
+    at least level and when one of its lines matches the pattern regex.
+
+    None is returned when there is nothing to filter, ValueError is raised
+    when the level is unknown or the pattern is invalid.
+    """
+    if level and str(level).upper() not in LEVELS:
+        raise ValueError(f"unknown log level {level}")
+    minimum: int = LEVELS[str(level).upper()] if level else 0
+    try:
+        regex: Optional[re.Pattern] = re.compile(pattern) if pattern else None
+    except re.error as err:
+        raise ValueError(f"invalid pattern {pattern}") from err
+    if not minimum and regex is None:
+        return None
+
+    def match(record: Record) -> bool:
+        if minimum:
+            found = LEVEL_PATTERN.search(record[0][1])
+            if not found or LEVELS[found.group(1)] < minimum:
+                return False
+        return regex is None or any(regex.search(line) for _, line in record)
+
+    return match
+
+
+def _records_backward(
+    mapped: mmap.mmap, end: int, stop: int, grouped: bool
+) -> Iterator[Record]:
+    """Yield the records ending before the end offset from the last one
+    without going before the stop offset, each line is its own record when
+    grouped is False.
+    """
+    continuation: Record = []
+    position: int = end - 1
+    while position >= stop:
+        start: int = mapped.rfind(b"\n", stop, position) + 1 or stop
+        line: Tuple[int, str] = (
+            position + 1,
+            mapped[start:position].decode("utf-8", "replace"),
+        )
+        position = start - 1
+        if not grouped:
+            yield [line]
+        elif LEVEL_PATTERN.search(line[1]):
+            yield [line, *reversed(continuation)]
+            continuation = []
+        else:
+            continuation.append(line)
+    if continuation:
+        yield list(reversed(continuation))
+
+
+def _records_forward(
+    mapped: mmap.mmap, start: int, end: int, grouped: bool
+) -> Iterator[Record]:
+    """Yield the records between the start and end offsets, each line is
+    its own record when grouped is False.
+    """
+    record: Record = []
+    while start < end:
+        position: int = mapped.find(b"\n", start, end)
+        line: Tuple[int, str] = (
+            position + 1,
+            mapped[start:position].decode("utf-8", "replace"),
+        )
+        start = position + 1
+        if record and (not grouped or LEVEL_PATTERN.search(line[1])):
+            yield record
+            record = []
+        record.append(line)
+    if record:
+        yield record
+
+
+def tail(
+    path: str,
+    count: int,
+    match: Optional[Callable[[Record], bool]] = None,
+    max_scan: int = 16 * 1024 * 1024,
+) -> Tuple[Record, int, int]:
+    """Read about the last count lines of a log file, a record is never
+    split.
+
+    The file is memory-mapped and scanned backwards from its last complete
+    line, at most max_scan bytes are scanned when filtering. The matching
+    lines are returned in the file order with the offset where to resume
+    reading and the file size.
+    """
+    with open(path, "rb") as log:
+        size: int = os.fstat(log.fileno()).st_size
+        if not size:
+            return [], 0, 0
+        with mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end: int = mapped.rfind(b"\n") + 1
+            stop: int = max(0, end - max_scan) if match else 0
+            lines: Record = []
+            for record in _records_backward(mapped, end, stop, bool(match)):
+                if match is None or match(record):
+                    if lines and len(lines) + len(record) > count:
+                        break
+                    lines.extend(reversed(record))
+                    if len(lines) >= count:
+                        break
+    lines.reverse()
+    return lines, end, size
+
+
+def follow(
+    path: str,
+    offset: int,
+    count: int,
+    match: Optional[Callable[[Record], bool]] = None,
+) -> Tuple[Record, int, int, bool]:
+    """Read about count lines written after the offset of a log file, a
+    record is never split.
+
+    Only complete lines are returned with the offset where to resume
+    reading, the file size and whether the file was rotated: when the
+    offset is past the end of the file, the file was rotated or truncated
+    and it is read from its beginning. ValueError is raised when the offset
+    is negative.
+    """
+    if offset < 0:
+        raise ValueError(f"invalid offset {offset}")
+    with open(path, "rb") as log:
+        size: int = os.fstat(log.fileno()).st_size
+        rotated: bool = offset > size
+        if rotated:
+            offset = 0
+        if offset == size:
+            return [], offset, size, rotated
+        with mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end: int = mapped.rfind(b"\n", offset) + 1
+            lines: Record = []
+            resume: int = offset
+            for record in _records_forward(mapped, offset, end, bool(match)):
+                if match is None or match(record):
+                    if lines and len(lines) + len(record) > count:
+                        break
+                    lines.extend(record)
+                resume = record[-1][0]
+                if len(lines) >= count:
+                    break
+    return lines, resume, size, rotated
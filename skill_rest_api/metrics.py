@@ -0,0 +1,223 @@
+"""Lightweight per-handler metrics
+"""
+
+import json
+from bisect import bisect_left
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+from ovos_bus_client.message import Message
+
+
+class HandlerMetrics:
+    """Counters and latency histogram of a single message type."""
+
+    __slots__ = (
+        "calls",
+        "errors",
+        "auth_failures",
+        "expired",
+        "rate_limited",
+        "payload_bytes",
+        "payload_samples",
+        "buckets",
+        "latency_sum",
+        "latency_max",
+    )
+
+    def __init__(self, size: int) -> None:
+        self.calls: int = 0
+        self.errors: int = 0
+        self.auth_failures: int = 0
+        self.expired: int = 0
+        self.rate_limited: int = 0
+        self.payload_bytes: int = 0
+        self.payload_samples: int = 0
+        self.buckets: List[int] = [0] * (size + 1)
+        self.latency_sum: float = 0.0
+        self.latency_max: float = 0.0
+
+
+class Metrics:
+    """Record call counts, errors, authentication failures, payload sizes
+    and latencies of the bus handlers.
+
+    Latencies are stored in a fixed buckets histogram, percentiles are
+    estimated from it when a snapshot is requested. Payload sizes are only
+    sampled every sample_rate calls to keep the serialization cost out of
+    most calls.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...], sample_rate: int = 16) -> None:
+        self.bounds: Tuple[float, ...] = buckets
+        self.sample_rate: int = sample_rate
+        self.sources: Dict[str, Callable[[], dict]] = {}
+        self._handlers: Dict[str, HandlerMetrics] = {}
+        self._lock: Lock = Lock()
+
+    def _get(self, name: str) -> HandlerMetrics:
+        """Return the metrics of a message type, created on first use."""
+        metrics: Optional[HandlerMetrics] = self._handlers.get(name)
+        if metrics is None:
+            with self._lock:
+                metrics = self._handlers.setdefault(
+                    name, HandlerMetrics(len(self.bounds))
+                )
+        return metrics
+
+    def observe(self, name: str, elapsed: float, error: bool = False) -> None:
+        """Record a single call and its latency in seconds."""
+        metrics: HandlerMetrics = self._get(name)
+        index: int = bisect_left(self.bounds, elapsed)
+        with self._lock:
+            metrics.calls += 1
+            metrics.buckets[index] += 1
+            metrics.latency_sum += elapsed
+            if elapsed > metrics.latency_max:
+                metrics.latency_max = elapsed
+            if error:
+                metrics.errors += 1
+
+    def auth_failure(self, name: str) -> None:
+        """Record an authentication failure."""
+        metrics: HandlerMetrics = self._get(name)
+        with self._lock:
+            metrics.auth_failures += 1
+
+    def expire(self, name: str) -> None:
+        """Record a message dropped because its deadline passed."""
+        metrics: HandlerMetrics = self._get(name)
+        with self._lock:
+            metrics.expired += 1
+
+    def rate_limit(self, name: str) -> None:
+        """Record a message rejected by the rate limiter."""
+        metrics: HandlerMetrics = self._get(name)
+        with self._lock:
+            metrics.rate_limited += 1
+
+    def payload(self, name: str, message: Message) -> None:
+        """Record the payload size of one message out of sample_rate."""
+        metrics: HandlerMetrics = self._get(name)
+        if metrics.calls % self.sample_rate:
+            return
+        size: int = len(json.dumps(message.data, default=str))
+        with self._lock:
+            metrics.payload_bytes += size
+            metrics.payload_samples += 1
+
+    def wrap(self, name: str, handler: Callable[[Message], None]) -> Callable:
+        """Wrap a bus handler to record its metrics under name."""
+
+        @wraps(handler)
+        def wrapper(message: Message) -> None:
+            self.payload(name, message)
+            start: float = perf_counter()
+            error: bool = True
+            try:
+                handler(message)
+                error = False
+            finally:
+                self.observe(name, perf_counter() - start, error)
+
+        return wrapper
+
+    def percentile(self, metrics: HandlerMetrics, quantile: float) -> float:
+        """Estimate a latency percentile from the histogram, the upper bound
+        of the matching bucket is returned.
+        """
+        if not metrics.calls:
+            return 0.0
+        rank: float = quantile * metrics.calls
+        cumulative: int = 0
+        for index, count in enumerate(metrics.buckets):
+            cumulative += count
+            if cumulative >= rank:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], metrics.latency_max)
+                break
+        return metrics.latency_max
+
+    def snapshot(self) -> dict:
+        """Return every metric as a JSON serializable dict."""
+        handlers: dict = {}
+        with self._lock:
+            for name, metrics in self._handlers.items():
+                handlers[name] = {
+                    "calls": metrics.calls,
+                    "errors": metrics.errors,
+                    "auth_failures": metrics.auth_failures,
+                    "expired": metrics.expired,
+                    "rate_limited": metrics.rate_limited,
+                    "payload_bytes_avg": (
+                        metrics.payload_bytes // metrics.payload_samples
+                        if metrics.payload_samples
+                        else 0
+                    ),
+                    "latency": {
+                        "buckets": dict(
+                            zip([*map(str, self.bounds), "+Inf"], metrics.buckets)
+                        ),
+                        "sum": metrics.latency_sum,
+                        "max": metrics.latency_max,
+                        "p50": self.percentile(metrics, 0.50),
+                        "p95": self.percentile(metrics, 0.95),
+                        "p99": self.percentile(metrics, 0.99),
+                    },
+                }
+        return {
+            "handlers": handlers,
+            **{name: source() for name, source in self.sources.items()},
+        }
+
+    def prometheus(self, prefix: str = "ovos_api") -> str:
+        """Render the metrics using the Prometheus text format."""
+        lines: List[str] = []
+        counters: Tuple[Tuple[str, str], ...] = (
+            ("requests_total", "calls"),
+            ("errors_total", "errors"),
+            ("auth_failures_total", "auth_failures"),
+            ("expired_total", "expired"),
+            ("rate_limited_total", "rate_limited"),
+        )
+        with self._lock:
+            handlers: List[Tuple[str, HandlerMetrics]] = list(self._handlers.items())
+            for metric, attribute in counters:
+                lines.append(f"# TYPE {prefix}_{metric} counter")
+                for name, metrics in handlers:
+                    lines.append(
+                        f'{prefix}_{metric}{{type="{name}"}} '
+                        f"{getattr(metrics, attribute)}"
+                    )
+
+            lines.append(f"# TYPE {prefix}_latency_seconds histogram")
+            for name, metrics in handlers:
+                cumulative: int = 0
+                for bound, count in zip(
+                    [*map(str, self.bounds), "+Inf"], metrics.buckets
+                ):
+                    cumulative += count
+                    lines.append(
+                        f'{prefix}_latency_seconds_bucket{{type="{name}",'
+                        f'le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'{prefix}_latency_seconds_sum{{type="{name}"}} '
+                    f"{metrics.latency_sum}"
+                )
+                lines.append(
+                    f'{prefix}_latency_seconds_count{{type="{name}"}} {metrics.calls}'
+                )
+
+            lines.append(f"# TYPE {prefix}_payload_bytes summary")
+            for name, metrics in handlers:
+                lines.append(
+                    f'{prefix}_payload_bytes_sum{{type="{name}"}} '
+                    f"{metrics.payload_bytes}"
+                )
+                lines.append(
+                    f'{prefix}_payload_bytes_count{{type="{name}"}} '
+                    f"{metrics.payload_samples}"
+                )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,137 @@
+"""Background Internet connectivity prober
+"""
+
+import random
+import time
+from threading import Event, Lock, Thread
+from typing import Callable, List, Optional
+from ovos_utils.log import LOG
+
+
+class ConnectivityProber:
+    """Refresh the Internet connectivity state from a background thread so
+    the bus handlers can answer from the last known state without blocking.
+
+    When the instance is offline the probe interval backs off exponentially
+    up to max_backoff, a random jitter is applied to every delay to avoid
+    a whole fleet probing at the same time.
+    """
+
+    def __init__(
+        self,
+        interval: float = 60,
+        max_backoff: float = 600,
+        jitter: float = 0.1,
+        probe: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        self.interval: float = interval
+        self.max_backoff: float = max_backoff
+        self.jitter: float = jitter
+        self.status: Optional[bool] = None
+        self.checked_at: Optional[float] = None
+        self._probe: Optional[Callable[[], bool]] = probe
+        self._failures: int = 0
+        self._lock: Lock = Lock()
+        self._waiters: Optional[List[Callable[[dict], None]]] = None
+        self._stopping: Event = Event()
+        self._thread: Optional[Thread] = None
+        self.on_change: Optional[Callable[[dict], None]] = None
+
+    @property
+    def age(self) -> Optional[float]:
+        """Number of seconds since the last completed probe."""
+        if self.checked_at is None:
+            return None
+        return round(time.monotonic() - self.checked_at, 3)
+
+    def state(self) -> dict:
+        """Last known connectivity state and its age."""
+        return {"status": self.status, "age": self.age}
+
+    def start(self) -> None:
+        """Start the background probing thread if not already running."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = Thread(target=self._loop, name="rest-api-prober", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background probing thread."""
+        self._stopping.set()
+
+    def refresh(self, callback: Optional[Callable[[dict], None]] = None) -> None:
+        """Force a probe without blocking the caller.
+
+        The callback is called with the new state once the probe completes.
+        Callers arriving while a probe is already running share its result
+        instead of starting a new one.
+        """
+        if self._join(callback):
+            Thread(target=self._run, daemon=True).start()
+
+    def probe(self, timeout: Optional[float] = None) -> dict:
+        """Force a probe and wait for its result, sharing any probe already
+        running.
+        """
+        done: Event = Event()
+        self.refresh(lambda _: done.set())
+        done.wait(timeout)
+        return self.state()
+
+    def _join(self, callback: Optional[Callable[[dict], None]]) -> bool:
+        """Register the callback on the in-flight probe, return True when
+        the caller is responsible for running a new probe.
+        """
+        with self._lock:
+            if self._waiters is not None:
+                if callback:
+                    self._waiters.append(callback)
+                return False
+            self._waiters = [callback] if callback else []
+            return True
+
+    def _run(self) -> None:
+        """Run a single probe and notify the waiting callers."""
+        try:
+            if self._probe:
+                status: bool = bool(self._probe())
+            else:
+                # pylint: disable=import-outside-toplevel
+                from ovos_utils.network_utils import is_connected
+
+                status = bool(is_connected())
+        except Exception as err:  # pylint: disable=broad-except
+            LOG.debug(f"connectivity probe failed: {err}")
+            status = False
+
+        with self._lock:
+            changed: bool = self.status != status
+            self.status = status
+            self.checked_at = time.monotonic()
+            self._failures = 0 if status else self._failures + 1
+            waiters, self._waiters = self._waiters or [], None
+
+        state: dict = self.state()
+        if changed and self.on_change:
+            waiters.append(self.on_change)
+        for callback in waiters:
+            try:
+                callback(state)
+            except Exception as err:  # pylint: disable=broad-except
+                LOG.error("unable to deliver the connectivity state")
+                LOG.debug(err)
+
+    def _delay(self) -> float:
+        """Compute the delay before the next periodic probe."""
+        delay: float = self.interval
+        if self._failures:
+            delay = min(self.interval * 2**self._failures, self.max_backoff)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _loop(self) -> None:
+        """Periodically refresh the connectivity state until stopped."""
+        while not self._stopping.is_set():
+            if self._join(None):
+                self._run()
+            self._stopping.wait(self._delay())
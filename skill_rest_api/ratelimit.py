@@ -0,0 +1,61 @@
+"""Token bucket rate limiting of the API clients
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Tuple
+
+
+class RateLimiter:
+    """Token bucket rate limiter keyed by client and message type.
+
+    Each key gets a bucket of burst tokens refilled at rate tokens per
+    second, the least recently used buckets are dropped when more than
+    max_buckets keys are tracked. A rate of 0 disables the limiter.
+    """
+
+    def __init__(self, rate: float, burst: float, max_buckets: int = 1024) -> None:
+        self.rate: float = rate
+        self.burst: float = burst
+        self.max_buckets: int = max_buckets
+        self._buckets: "OrderedDict[Tuple[str, ...], List[float]]" = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def configure(self, rate: float, burst: float) -> None:
+        """Apply a new rate and burst, the buckets are reset."""
+        with self._lock:
+            self.rate = rate
+            self.burst = max(burst, 1.0)
+            self._buckets.clear()
+
+    def acquire(self, *key: str) -> float:
+        """Take a token from the bucket of key.
+
+        0 is returned when the call is allowed, otherwise the number of
+        seconds before a token will be available.
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            bucket: List[float] = self._refill(key)
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return round((1 - bucket[0]) / self.rate, 3)
+
+    def _refill(self, key: Tuple[str, ...]) -> List[float]:
+        """Return the bucket of key refilled up to now, the lock must be
+        held by the caller.
+        """
+        now: float = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        return bucket
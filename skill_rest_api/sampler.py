@@ -0,0 +1,186 @@
+"""Background sampling of the system load
+"""
+
+import math
+import os
+import time
+from array import array
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional, Union
+from ovos_utils.log import LOG
+
+FIELDS = (
+    "time",
+    "cpu",
+    "memory",
+    "memory_available",
+    "load_1",
+    "load_5",
+    "load_15",
+    "rss",
+)
+PROC_FILES = {
+    "stat": "/proc/stat",
+    "meminfo": "/proc/meminfo",
+    "loadavg": "/proc/loadavg",
+    "statm": "/proc/self/statm",
+}
+MEMINFO_KEYS = (b"MemTotal", b"MemAvailable", b"MemFree", b"Buffers", b"Cached")
+
+
+def _rounded(value: float) -> Optional[float]:
+    """Round a sampled value, None is returned for the missing ones."""
+    return None if math.isnan(value) else round(value, 2)
+
+
+class SystemSampler:
+    """Sample the CPU usage, the memory usage, the load average and the
+    resident memory of the OVOS process from a background thread.
+
+    The samples are kept in a fixed-size ring buffer made of one array per
+    field, the readers only copy these arrays so no /proc I/O happens when
+    the statistics are requested. An interval of 0 disables the sampler.
+    The memory fields are None when /proc/meminfo lacks the needed fields.
+    """
+
+    def __init__(self, interval: float = 5, size: int = 720) -> None:
+        self.interval: float = interval
+        self.size: int = size
+        self._buffers: Dict[str, array] = {
+            field: array("d", bytes(8 * size)) for field in FIELDS
+        }
+        self._index: int = 0
+        self._count: int = 0
+        self._cpu: Optional[tuple] = None
+        self._page_size: int = os.sysconf("SC_PAGE_SIZE")
+        self._lock: Lock = Lock()
+        self._stopping: Event = Event()
+        self._thread: Optional[Thread] = None
+
+    @staticmethod
+    def available() -> bool:
+        """Check if the /proc files used by the sampler could be read."""
+        return all(os.access(path, os.R_OK) for path in PROC_FILES.values())
+
+    def start(self) -> None:
+        """Start the background sampling thread if not already running."""
+        self._stopping.clear()
+        if self._thread and self._thread.is_alive():
+            return
+        if not self.interval or not self.available():
+            return
+        self._thread = Thread(target=self._loop, name="rest-api-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sampling thread."""
+        self._stopping.set()
+
+    def current(self) -> Optional[dict]:
+        """Return the last sample, None when nothing was sampled yet."""
+        with self._lock:
+            if not self._count:
+                return None
+            index: int = (self._index - 1) % self.size
+            return {field: _rounded(self._buffers[field][index]) for field in FIELDS}
+
+    def history(self, points: int) -> Dict[str, List[Optional[float]]]:
+        """Return the samples from the oldest one, downsampled to at most
+        points values per field by averaging consecutive samples.
+        """
+        with self._lock:
+            count: int = self._count
+            start: int = (self._index - count) % self.size
+            samples: Dict[str, array] = {}
+            for field, buffer in self._buffers.items():
+                ordered: array = buffer[start:] + buffer[:start]
+                samples[field] = ordered[:count]
+
+        points = max(1, min(points, count))
+        history: Dict[str, List[Optional[float]]] = {field: [] for field in FIELDS}
+        for point in range(points if count else 0):
+            low: int = point * count // points
+            high: int = (point + 1) * count // points
+            for field in FIELDS:
+                values: array = samples[field][low:high]
+                value: float = (
+                    values[-1] if field == "time" else sum(values) / len(values)
+                )
+                history[field].append(_rounded(value))
+        return history
+
+    def _loop(self) -> None:
+        """Sample the system load until stopped."""
+        descriptors: Dict[str, int] = {}
+        try:
+            for name, path in PROC_FILES.items():
+                descriptors[name] = os.open(path, os.O_RDONLY)
+            while True:
+                try:
+                    self._sample(descriptors)
+                except (OSError, ValueError, IndexError, KeyError) as err:
+                    LOG.debug(f"unable to sample the system load: {err}")
+                if self._stopping.wait(self.interval or 1):
+                    break
+        except OSError as err:
+            LOG.error("unable to sample the system load")
+            LOG.debug(err)
+        finally:
+            for descriptor in descriptors.values():
+                os.close(descriptor)
+
+    def _sample(self, descriptors: Dict[str, int]) -> None:
+        """Read the /proc files and append a sample to the ring buffer, the
+        files are kept open and read again from their beginning. The first
+        call only records the CPU counters.
+        """
+        stat: List[bytes] = (
+            os.pread(descriptors["stat"], 256, 0).split(b"\n", 1)[0].split()
+        )
+        jiffies: List[int] = [int(value) for value in stat[1:9]]
+        total: int = sum(jiffies)
+        idle: int = jiffies[3] + jiffies[4]
+        previous: Optional[tuple] = self._cpu
+        self._cpu = (total, idle)
+        if previous is None:
+            # The CPU usage is computed between two samples.
+            return
+        cpu: float = 0.0
+        if total > previous[0]:
+            cpu = 100 * (1 - (idle - previous[1]) / (total - previous[0]))
+
+        meminfo: Dict[bytes, int] = {}
+        for line in os.pread(descriptors["meminfo"], 8192, 0).splitlines():
+            key, _, value = line.partition(b":")
+            if key in MEMINFO_KEYS:
+                meminfo[key] = int(value.split()[0]) * 1024
+        available: Union[int, float] = meminfo.get(b"MemAvailable", math.nan)
+        if b"MemAvailable" not in meminfo and all(
+            key in meminfo for key in (b"MemFree", b"Buffers", b"Cached")
+        ):
+            # Kernels older than 3.14 don't report MemAvailable.
+            available = meminfo[b"MemFree"] + meminfo[b"Buffers"] + meminfo[b"Cached"]
+        memory: float = math.nan
+        if meminfo.get(b"MemTotal"):
+            memory = 100 * (1 - available / meminfo[b"MemTotal"])
+
+        load: List[bytes] = os.pread(descriptors["loadavg"], 128, 0).split()
+        rss: int = (
+            int(os.pread(descriptors["statm"], 128, 0).split()[1]) * self._page_size
+        )
+
+        sample: tuple = (
+            time.time(),
+            cpu,
+            memory,
+            available,
+            float(load[0]),
+            float(load[1]),
+            float(load[2]),
+            rss,
+        )
+        with self._lock:
+            for field, value in zip(FIELDS, sample):
+                self._buffers[field][self._index] = value
+            self._index = (self._index + 1) % self.size
+            self._count = min(self._count + 1, self.size)
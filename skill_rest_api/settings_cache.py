@@ -0,0 +1,157 @@
+"""Cache of the parsed skills settings.json files
+"""
+
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from ovos_utils.log import LOG
+
+
+class SettingsCache:
+    """LRU cache of parsed settings.json files.
+
+    Entries are keyed by path and validated against the file
+    (st_mtime_ns, st_size) signature. When a file watcher is running, the
+    entries are trusted until the watcher reports a change which avoids the
+    stat() call on every hit.
+    """
+
+    def __init__(self, max_size: int = 64, workers: int = 4) -> None:
+        self.max_size: int = max_size
+        self.workers: int = workers
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], dict]]" = OrderedDict()
+        self._lock: Lock = Lock()
+        self._watcher = None
+
+    @property
+    def watching(self) -> bool:
+        """True when the entries are invalidated by a file watcher."""
+        return self._watcher is not None
+
+    def watch(self, directory: str) -> bool:
+        """Invalidate the entries from inotify events on directory.
+
+        The watcher relies on watchdog which is an optional dependency,
+        False is returned when it is not available or when directory can't
+        be watched.
+        """
+        if self._watcher is not None:
+            return True
+        try:
+            # pylint: disable=import-outside-toplevel
+            from ovos_utils.file_utils import FileWatcher
+
+            self._watcher = FileWatcher([directory], self.invalidate, recursive=True)
+        except (ImportError, OSError) as err:
+            LOG.warning(f"unable to watch {directory}, using stat() validation instead")
+            LOG.debug(err)
+            return False
+        LOG.debug(f"watching {directory} for settings changes")
+        return True
+
+    def unwatch(self) -> None:
+        """Stop the file watcher, entries are validated by stat() again."""
+        if self._watcher is not None:
+            self._watcher.shutdown()
+            self._watcher = None
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop the entries living next to or under path, the whole cache is
+        dropped when no path is given.
+
+        Matching on the parent directory makes sure temporary files renamed
+        over a settings.json file invalidate it too.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            path = str(path)
+            folder: str = os.path.dirname(path)
+            for key in list(self._entries):
+                if os.path.dirname(key) == folder or key.startswith(path + os.sep):
+                    del self._entries[key]
+
+    def get(self, path: str) -> dict:
+        """Return the parsed settings.json file, reading it only when the
+        file changed since the last read.
+
+        FileNotFoundError is raised when the file doesn't exist and
+        ValueError when the content is not valid JSON.
+        """
+        path = str(path)
+        signature: Optional[Tuple[int, int]] = None
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None and not self.watching:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if entry[0] != signature:
+                entry = None
+        if entry is not None:
+            with self._lock:
+                if path in self._entries:
+                    self._entries.move_to_end(path)
+                self.hits += 1
+            return entry[1]
+
+        with open(path, encoding="utf-8") as settings_json:
+            stat = os.fstat(settings_json.fileno())
+            signature = (stat.st_mtime_ns, stat.st_size)
+            settings: dict = json.load(settings_json)
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = (signature, settings)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return settings
+
+    def load(self, path: str) -> dict:
+        """Same as get() but errors are returned as an error dict."""
+        try:
+            return self.get(path)
+        except FileNotFoundError:
+            return {"error": "no settings.json file found"}
+        except ValueError as err:
+            LOG.debug(err)
+            return {"error": "invalid settings.json file"}
+        except OSError as err:
+            LOG.error("unable to retrieve skill settings")
+            LOG.debug(err)
+            return {"error": "unable to read settings.json file"}
+
+    def load_many(self, paths: Dict[str, str]) -> Dict[str, dict]:
+        """Load several settings.json files at once, paths is a dict of
+        skill id and path.
+
+        Cached entries are served directly, the other files are read in a
+        thread pool.
+        """
+        results: Dict[str, dict] = {}
+        misses: List[str] = []
+        for skill, path in paths.items():
+            with self._lock:
+                cached: bool = path in self._entries
+            if cached:
+                results[skill] = self.load(path)
+            else:
+                misses.append(skill)
+
+        if len(misses) == 1:
+            results[misses[0]] = self.load(paths[misses[0]])
+        elif misses:
+            with ThreadPoolExecutor(
+                max_workers=min(self.workers, len(misses)),
+                thread_name_prefix="rest-api-settings",
+            ) as executor:
+                for skill, settings in zip(
+                    misses, executor.map(self.load, [paths[s] for s in misses])
+                ):
+                    results[skill] = settings
+        return results
@@ -0,0 +1,80 @@
+"""Coalescing of identical in-flight requests
+"""
+
+import json
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, List, Tuple
+from ovos_bus_client.message import Message
+from ovos_utils.log import LOG
+
+IGNORED_KEYS = ("app_key", "request_id", "deadline", "encoding")
+
+
+def request_key(message: Message) -> str:
+    """Build the key identifying identical requests from the message type
+    and its normalized data, the per-request fields are ignored.
+    """
+    data: dict = {k: v for k, v in message.data.items() if k not in IGNORED_KEYS}
+    return f"{message.msg_type}:{json.dumps(data, sort_keys=True, default=str)}"
+
+
+class SingleFlight:
+    """Run a computation once for all the identical requests in flight and
+    fan its result out to every requester.
+
+    When ttl is set, a result is also reused by the requests arriving within
+    ttl seconds after it was computed.
+    """
+
+    def __init__(self, ttl: float = 0.0) -> None:
+        self.ttl: float = ttl
+        self._calls: Dict[str, List[Callable[[Any], None]]] = {}
+        self._results: Dict[str, Tuple[float, Any]] = {}
+        self._lock: Lock = Lock()
+
+    def clear(self) -> None:
+        """Forget the results kept for the TTL."""
+        with self._lock:
+            self._results.clear()
+
+    def do(self, key: str, func: Callable[[], Any], callback: Callable) -> None:
+        """Call callback with the result of func, func is only called when
+        no identical request is already computing it.
+
+        When func raises, every requester gets an error result which is not
+        kept for the TTL.
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                result: Any = cached[1]
+            elif key in self._calls:
+                self._calls[key].append(callback)
+                return
+            else:
+                self._calls[key] = [callback]
+                cached = None
+        if cached is not None:
+            callback(result)
+            return
+
+        failed: bool = False
+        try:
+            result = func()
+        except Exception as err:  # pylint: disable=broad-except
+            LOG.error(f"unable to process {key.split(':', 1)[0]}")
+            LOG.debug(err)
+            result = {"error": "unable to process the request"}
+            failed = True
+
+        with self._lock:
+            callbacks: List[Callable] = self._calls.pop(key)
+            if self.ttl and not failed:
+                now: float = time.monotonic()
+                self._results = {
+                    k: v for k, v in self._results.items() if now - v[0] < self.ttl
+                }
+                self._results[key] = (now, result)
+        for waiting in callbacks:
+            waiting(result)
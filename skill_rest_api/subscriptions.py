@@ -0,0 +1,100 @@
+"""Push-based state change subscriptions
+"""
+
+from threading import Lock, Timer
+from typing import Any, Callable, Dict, List, Optional, Set
+
+TOPICS = ("awake", "internet", "config", "cache")
+
+
+def invalid_topics(topics: Any) -> Optional[str]:
+    """Check the topics requested by a client, return why they are invalid
+    or None when they are valid.
+    """
+    if not isinstance(topics, list) or not all(
+        isinstance(topic, str) for topic in topics
+    ):
+        return "topics must be a list of topic names"
+    unknown: List[str] = [topic for topic in topics if topic not in TOPICS]
+    if unknown:
+        return f"unknown topics {', '.join(unknown)}"
+    return None
+
+
+class Subscriptions:
+    """Keep track of the topics each client subscribed to and emit the
+    state changes of these topics.
+
+    States published within window seconds are coalesced, only the last one
+    of each topic is emitted and only when it differs from the previously
+    emitted state. A state could be a callable, it is then evaluated when
+    the window closes.
+    """
+
+    def __init__(
+        self, emit: Callable[[str, dict, List[str]], None], window: float = 0.5
+    ) -> None:
+        self.window: float = window
+        self._emit: Callable[[str, dict, List[str]], None] = emit
+        self._clients: Dict[str, Set[str]] = {topic: set() for topic in TOPICS}
+        self._pending: Dict[str, Any] = {}
+        self._last: Dict[str, dict] = {}
+        self._timer: Optional[Timer] = None
+        self._lock: Lock = Lock()
+
+    def subscribe(self, client: str, topics: List[str]) -> List[str]:
+        """Subscribe a client to topics, return its subscriptions."""
+        with self._lock:
+            for topic in topics:
+                if topic in self._clients:
+                    self._clients[topic].add(client)
+            return self._topics(client)
+
+    def unsubscribe(self, client: str, topics: Optional[List[str]] = None) -> List[str]:
+        """Unsubscribe a client from topics or from every topic when none
+        are given, return its remaining subscriptions.
+        """
+        with self._lock:
+            for topic in topics or TOPICS:
+                self._clients.get(topic, set()).discard(client)
+            return self._topics(client)
+
+    def _topics(self, client: str) -> List[str]:
+        """List the topics a client subscribed to."""
+        return [topic for topic in TOPICS if client in self._clients[topic]]
+
+    def publish(self, topic: str, state: Any) -> None:
+        """Publish the new state of a topic."""
+        with self._lock:
+            self._pending[topic] = state
+            if self.window and self._timer is not None:
+                return
+            if self.window:
+                self._timer = Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Emit the pending states which changed since the last emission."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._timer = None
+        for topic, state in pending.items():
+            if callable(state):
+                state = state()
+            with self._lock:
+                if self._last.get(topic) == state:
+                    continue
+                self._last[topic] = state
+                clients: List[str] = sorted(self._clients[topic])
+            if clients:
+                self._emit(topic, state, clients)
+
+    def cancel(self) -> None:
+        """Cancel the pending emission."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
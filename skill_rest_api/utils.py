@@ -1,11 +1,14 @@
 """Functions used across the skill
 """
 
-from base64 import b64encode
-from pathlib import Path
+from hashlib import sha256
+from hmac import compare_digest
+from json import dumps
+from typing import Any, Optional
 from ovos_bus_client.message import Message
 from ovos_utils.log import LOG
-from shutil import rmtree
+from .encoding import encode
+from time import perf_counter, time
 
 
 def check_auth(self, message: dict) -> bool:
@@ -13,68 +16,193 @@ def check_auth(self, message: dict) -> bool:
     REST API based on a Bearer token declared on the API configuration and
     on the skill's settings.
 
-    api_key contains the value registred settings.json and app_key
-    contains the key sent by API during a call.
+    api_digest contains the base64 encoded value registred settings.json,
+    computed once when the settings change, and app_key contains the key
+    sent by API during a call.
 
-    To authenticate, both variables should match.
+    To authenticate, both variables should match. The result only applies
+    to the message being checked. The keys are always compared so a valid
+    key is never refused, the failures are throttled per sender and message
+    type to answer the senders retrying bad keys with a retry_after.
     """
-    if self.configured:
-        api_key: bytes = b64encode(self.api_key.encode("utf-8"))
-        app_key: str = message.data.get("app_key")
-        if api_key.decode("utf-8") == app_key:
-            LOG.debug("api and skill are authenticated")
-            self.authenticated = True
-            return True
-        self.bus.emit(
-            Message(
-                str(message.msg_type) + ".answer",
-                data={"error": "both keys don't match"},
-                context={"authenticated": False},
-            )
+    msg_type: str = str(message.msg_type)
+    start: float = perf_counter()
+    authenticated: bool = valid_key(self, message)
+    self.metrics.observe("check_auth", perf_counter() - start)
+    if authenticated:
+        LOG.debug("api and skill are authenticated")
+        return True
+
+    self.metrics.auth_failure(msg_type)
+    if not (self.configured and self.api_digest):
+        _deny(self, message, {"error": "no api key detected from home.mycroft.ai"})
+        LOG.debug("no api key found in settings.json")
+        return False
+    retry_after: float = self.auth_limiter.acquire(sender(message), msg_type)
+    if retry_after:
+        self.metrics.rate_limit(msg_type)
+        _deny(
+            self,
+            message,
+            {"error": "too many authentication failures", "retry_after": retry_after},
         )
-        LOG.debug("both keys don't match")
+        LOG.debug(f"authentication failures of {sender(message)} are throttled")
         return False
+    _deny(self, message, {"error": "both keys don't match"})
+    LOG.debug("both keys don't match")
+    return False
+
+
+def valid_key(self, message: dict) -> bool:
+    """Compare in constant time the app_key of a message with the digest of
+    the skill's api key, nothing is answered.
+    """
+    app_key = message.data.get("app_key")
+    return bool(
+        self.configured
+        and self.api_digest
+        and isinstance(app_key, str)
+        and compare_digest(self.api_digest, app_key.encode("utf-8"))
+    )
+
+
+def _deny(self, message: dict, data: dict) -> None:
+    """Answer a message which failed the authentication."""
     self.bus.emit(
         Message(
             str(message.msg_type) + ".answer",
-            data={"error": "no api key detected from home.mycroft.ai"},
-            context={"authenticated": False},
+            data=data,
+            context={"authenticated": False, **correlation(message)},
         )
     )
-    self.log.debug("no api key found in settings.json")
 
-    return False
 
+def as_bool(value: Any) -> bool:
+    """Coerce a setting to a bool, the checkboxes declared in
+    settingsmeta.json could be stored as "true" or "false" strings.
+    """
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes", "on")
+    return bool(value)
+
+
+def configuration() -> dict:
+    """Return the configuration from mycroft.conf, ovos-config is only
+    imported on first use to keep it out of the skill load path.
+    """
+    # pylint: disable=import-outside-toplevel
+    from ovos_config.config import Configuration
+
+    return Configuration()
+
+
+def digest(data: dict) -> str:
+    """Compute a content hash of a JSON serializable dict, keys are sorted
+    to make the hash independent of the insertion order.
+    """
+    payload: str = dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return sha256(payload.encode("utf-8")).hexdigest()
+
+
+def resolve_pointer(document: Any, pointer: str) -> Any:
+    """Resolve a JSON pointer (RFC 6901) against a document.
+
+    KeyError is raised when the pointer doesn't match any value.
+    """
+    if pointer == "":
+        return document
+    if not pointer.startswith("/"):
+        raise KeyError(pointer)
+    for token in pointer[1:].split("/"):
+        token = token.replace("~1", "/").replace("~0", "~")
+        if isinstance(document, list):
+            try:
+                document = document[int(token)]
+            except (ValueError, IndexError) as err:
+                raise KeyError(pointer) from err
+        elif isinstance(document, dict) and token in document:
+            document = document[token]
+        else:
+            raise KeyError(pointer)
+    return document
+
+
+def client_id(message: Message) -> str:
+    """Identify the API client which sent a message, the client_id is
+    looked up in the message context then in its data.
+    """
+    client = message.context.get("client_id", message.data.get("client_id"))
+    return str(client or message.context.get("source") or "anonymous")
+
+
+def sender(message: Message) -> str:
+    """Identify the connection which sent a message for the rate limiting,
+    only the context set on the bus side is used because the data is
+    supplied by the API client.
+    """
+    client = message.context.get("client_id") or message.context.get("source")
+    return str(client or "anonymous")
 
-def delete(self, directory: str, parent: bool = False) -> bool:
-    """Delete files and directories from a parent directory
 
-    Parent directory is not removed by default, the parent option need to
-    defined to True.
+def correlation(message: Message) -> dict:
+    """Return the context used to correlate an answer with its request,
+    the request_id is looked up in the message context then in its data.
     """
-    directory = Path(directory)
+    request_id = message.context.get("request_id", message.data.get("request_id"))
+    if request_id is None:
+        return {}
+    return {"request_id": request_id}
+
+
+def deadline_passed(message: Message) -> bool:
+    """Check if the deadline (epoch in seconds) of a message passed, the
+    deadline is looked up in the message context then in its data.
+    """
+    deadline = message.context.get("deadline", message.data.get("deadline"))
+    if deadline is None:
+        return False
     try:
-        for item in directory.iterdir():
-            if item.is_dir():
-                rmtree(item)
-            else:
-                item.unlink()
-        if parent:
-            rmtree(directory)
-            LOG.debug(f"parent directory {directory} has been removed")
-        return True
-    except OSError as err:
-        LOG.debug(f"unable to delete {directory} directory: {err}")
+        return time() > float(deadline)
+    except (TypeError, ValueError):
         return False
 
 
-def send(self, msg_type: str, data: dict) -> None:
+def send(
+    self,
+    msg_type: str,
+    data: dict,
+    context: Optional[dict] = None,
+    message: Optional[Message] = None,
+    authenticated: bool = True,
+) -> None:
     """This function is a wrapper to send message to the bus with pre-exiting
     data.
 
     It wraps self.bus.emit(Message()) which avoid to have to load twice the
-    same library and avoid code duplication.
+    same library and avoid code duplication. Extra context could be merged
+    into the answer context, the request_id of the message being answered
+    is echoed to let the client correlate the answer. Answers are sent
+    after a successful authentication unless authenticated is False.
+
+    When the message being answered requests an encoding in its context or
+    data, payloads larger than the encoding threshold are sent encoded and
+    the encoding is noted in the answer context.
     """
+    if message:
+        encoding = message.context.get("encoding", message.data.get("encoding"))
+        encoded = encode(data, encoding, self.encoding_threshold) if encoding else None
+        if encoded:
+            data, extra = encoded
+            context = {**extra, **(context or {})}
+
     self.bus.emit(
-        Message(msg_type, data=data, context={"authenticated": self.authenticated})
+        Message(
+            msg_type,
+            data=data,
+            context={
+                "authenticated": authenticated,
+                **(correlation(message) if message else {}),
+                **(context or {}),
+            },
+        )
     )
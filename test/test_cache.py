@@ -0,0 +1,91 @@
+"""Tests of the TTS cache functions
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from skill_rest_api.cache import CacheStats, prune
+
+
+class TestPrune(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.now = time.time()
+        voice = Path(self.directory) / "voice" / "en-us"
+        voice.mkdir(parents=True)
+        # Five files of 100 bytes, file-0 being the coldest one.
+        for index in range(5):
+            path = voice / f"file-{index}.wav"
+            path.write_bytes(b"x" * 100)
+            used = self.now - 3600 * (5 - index)
+            os.utime(path, (used, used))
+
+    def files(self):
+        return sorted(
+            path.name for path in Path(self.directory).rglob("*") if path.is_file()
+        )
+
+    def test_size_budget_evicts_the_coldest_files(self):
+        report = prune(self.directory, max_bytes=250)
+        self.assertEqual(report["evicted"], {"files": 3, "bytes": 300})
+        self.assertEqual(report["kept"], {"files": 2, "bytes": 200})
+        self.assertEqual(self.files(), ["file-3.wav", "file-4.wav"])
+
+    def test_max_age_evicts_the_expired_files(self):
+        report = prune(self.directory, max_age=3 * 3600 + 60)
+        self.assertEqual(report["evicted"]["files"], 2)
+        self.assertEqual(self.files(), ["file-2.wav", "file-3.wav", "file-4.wav"])
+
+    def test_within_budget_keeps_everything(self):
+        report = prune(self.directory, max_bytes=1000, rank_by="mtime")
+        self.assertEqual(report["evicted"], {"files": 0, "bytes": 0})
+        self.assertEqual(len(self.files()), 5)
+        self.assertTrue((Path(self.directory) / "voice" / "en-us").is_dir())
+
+    def test_unknown_rank_by(self):
+        with self.assertRaises(ValueError):
+            prune(self.directory, max_bytes=0, rank_by="size")
+        self.assertEqual(len(self.files()), 5)
+
+
+class TestCacheStats(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.voice = Path(self.directory) / "dummy" / "default" / "en-us"
+        self.voice.mkdir(parents=True)
+        for index in range(3):
+            (self.voice / f"{index}.wav").write_bytes(b"x" * 10)
+        trash = Path(self.directory) / "dummy.0123.purge" / "default" / "en-us"
+        trash.mkdir(parents=True)
+        (trash / "old.wav").write_bytes(b"x" * 1000)
+        self.stats = CacheStats(self.directory)
+
+    def test_entries_per_module_voice_and_lang(self):
+        stats = self.stats.stats()
+        self.assertEqual(stats["total"]["files"], 3)
+        self.assertEqual(stats["total"]["bytes"], 30)
+        self.assertEqual(list(stats["entries"]), ["dummy/default/en-us"])
+        entry = stats["entries"]["dummy/default/en-us"]
+        self.assertLessEqual(entry["oldest"], entry["newest"])
+
+    def test_unchanged_directories_are_not_scanned_again(self):
+        self.stats.stats()
+        with mock.patch("skill_rest_api.cache.os.scandir", wraps=os.scandir) as scan:
+            self.assertEqual(self.stats.stats()["total"]["files"], 3)
+        scan.assert_not_called()
+
+    def test_changed_directories_are_scanned_again(self):
+        self.stats.stats()
+        (self.voice / "3.wav").write_bytes(b"x" * 5)
+        os.unlink(self.voice / "0.wav")
+        stats = self.stats.stats()
+        self.assertEqual(stats["total"]["files"], 3)
+        self.assertEqual(stats["total"]["bytes"], 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Tests of the compact encodings of the answer payloads
+"""
+
+import json
+import unittest
+import zlib
+from base64 import b64decode
+from unittest import mock
+
+from skill_rest_api import encoding
+from skill_rest_api.encoding import encode, negotiate
+
+DATA = {"skills": [f"skill-{index}.openvoiceos" for index in range(50)]}
+
+
+class TestNegotiate(unittest.TestCase):
+    def test_plain_json(self):
+        for requested in (
+            None,
+            "",
+            "json",
+            "gzip",
+            "zlib+zlib",
+            "json+zlib",
+            "brotli+json",
+        ):
+            with self.subTest(requested=requested):
+                self.assertIsNone(negotiate(requested))
+
+    def test_supported_encodings(self):
+        self.assertEqual(negotiate("zlib+json"), ("zlib", "json"))
+        self.assertEqual(negotiate("ZLIB+JSON"), ("zlib", "json"))
+
+    def test_msgpack_requires_the_module(self):
+        with mock.patch.object(encoding, "_msgpack", return_value=None):
+            self.assertIsNone(negotiate("msgpack"))
+            self.assertIsNone(negotiate("zlib+msgpack"))
+        with mock.patch.object(encoding, "_msgpack", return_value=mock.Mock()):
+            self.assertEqual(negotiate("zlib+msgpack"), ("zlib", "msgpack"))
+
+
+class TestEncode(unittest.TestCase):
+    def test_zlib_json_round_trip(self):
+        payload, context = encode(DATA, "zlib+json", threshold=0)
+        raw: bytes = zlib.decompress(b64decode(payload["payload"]))
+        self.assertEqual(json.loads(raw), DATA)
+        self.assertEqual(context["encoding"], "zlib+json")
+        self.assertEqual(context["size"], len(json.dumps(DATA)))
+        self.assertLess(len(payload["payload"]), context["size"])
+
+    def test_small_payloads_are_not_encoded(self):
+        size: int = len(json.dumps(DATA))
+        self.assertIsNone(encode(DATA, "zlib+json", threshold=size + 1))
+        self.assertIsNotNone(encode(DATA, "zlib+json", threshold=size))
+
+    def test_unsupported_encoding_is_not_encoded(self):
+        self.assertIsNone(encode(DATA, "brotli", threshold=0))
+        self.assertIsNone(encode(DATA, None, threshold=0))
+
+    def test_msgpack_serializer(self):
+        packer = mock.Mock()
+        packer.packb.return_value = b"packed"
+        with mock.patch.object(encoding, "_msgpack", return_value=packer):
+            payload, context = encode(DATA, "msgpack", threshold=0)
+        packer.packb.assert_called_once_with(DATA, default=str)
+        self.assertEqual(b64decode(payload["payload"]), b"packed")
+        self.assertEqual(context["encoding"], "msgpack")
+
+
+if __name__ == "__main__":
+    unittest.main()
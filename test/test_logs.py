@@ -0,0 +1,126 @@
+"""Tests of the reading of the OVOS log files
+"""
+
+import os
+import tempfile
+import unittest
+
+from skill_rest_api.logs import follow, log_files, log_path, matcher, tail
+
+LINES = [
+    "2024-01-01 10:00:00.000 - skills - ovos_core - INFO - loading skills",
+    "2024-01-01 10:00:01.000 - skills - ovos_core - ERROR - unable to load",
+    "Traceback (most recent call last):",
+    '  File "skill.py", line 1, in <module>',
+    "ImportError: no module named foo",
+    "2024-01-01 10:00:02.000 - skills - ovos_core - DEBUG - skills loaded",
+    "2024-01-01 10:00:03.000 - skills - ovos_core - WARNING - slow skill",
+]
+
+
+class LogTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: str = directory.name
+        self.path: str = os.path.join(self.directory, "skills.log")
+        self.write(LINES)
+
+    def write(self, lines, mode="w", partial=""):
+        with open(self.path, mode, encoding="utf-8") as log:
+            log.write("".join(f"{line}\n" for line in lines) + partial)
+
+    @staticmethod
+    def text(lines):
+        return [line for _, line in lines]
+
+
+class TestFiles(LogTestCase):
+    def test_log_files(self):
+        open(os.path.join(self.directory, "audio.log"), "w").close()
+        open(os.path.join(self.directory, "notes.txt"), "w").close()
+        self.assertEqual(log_files(self.directory), ["audio", "skills"])
+
+    def test_log_path(self):
+        self.assertEqual(log_path(self.directory, "skills"), self.path)
+        for service in ("audio", "../skills", ".hidden", "skills/x", ""):
+            with self.subTest(service=service):
+                self.assertIsNone(log_path(self.directory, service))
+
+
+class TestMatcher(unittest.TestCase):
+    def test_nothing_to_filter(self):
+        self.assertIsNone(matcher())
+
+    def test_invalid_filters(self):
+        with self.assertRaises(ValueError):
+            matcher(level="verbose")
+        with self.assertRaises(ValueError):
+            matcher(pattern="(")
+
+
+class TestTail(LogTestCase):
+    def test_last_lines(self):
+        lines, end, size = tail(self.path, 2)
+        self.assertEqual(self.text(lines), LINES[-2:])
+        self.assertEqual(end, size)
+        self.assertEqual(size, os.path.getsize(self.path))
+
+    def test_partial_line_is_skipped(self):
+        self.write([], mode="a", partial="2024-01-01 10:00:04.000 - half")
+        lines, end, size = tail(self.path, 1)
+        self.assertEqual(self.text(lines), LINES[-1:])
+        self.assertLess(end, size)
+
+    def test_level_keeps_the_traceback(self):
+        lines, _, _ = tail(self.path, 10, matcher(level="error"))
+        self.assertEqual(self.text(lines), LINES[1:5])
+
+    def test_pattern_matches_the_traceback(self):
+        lines, _, _ = tail(self.path, 10, matcher(pattern="ImportError"))
+        self.assertEqual(self.text(lines), LINES[1:5])
+
+    def test_record_is_not_split(self):
+        lines, _, _ = tail(self.path, 4, matcher(level="warning"))
+        self.assertEqual(self.text(lines), [LINES[6]])
+
+    def test_empty_file(self):
+        self.write([])
+        self.assertEqual(tail(self.path, 10), ([], 0, 0))
+
+
+class TestFollow(LogTestCase):
+    def test_new_lines_after_the_offset(self):
+        _, offset, _ = tail(self.path, 10)
+        self.write(["2024-01-01 10:00:05.000 - skills - ovos_core - INFO - new"], "a")
+        lines, resume, size, rotated = follow(self.path, offset, 10)
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(resume, size)
+        self.assertFalse(rotated)
+        self.assertEqual(follow(self.path, resume, 10)[0], [])
+
+    def test_count_resumes_after_the_last_line(self):
+        lines, resume, _, _ = follow(self.path, 0, 1)
+        self.assertEqual(self.text(lines), LINES[:1])
+        lines, _, _, _ = follow(self.path, resume, 100)
+        self.assertEqual(self.text(lines), LINES[1:])
+
+    def test_filtered_lines_are_skipped(self):
+        lines, resume, size, _ = follow(self.path, 0, 10, matcher(level="warning"))
+        self.assertEqual(self.text(lines), LINES[1:5] + LINES[6:])
+        self.assertEqual(resume, size)
+
+    def test_rotation(self):
+        size: int = os.path.getsize(self.path)
+        self.write(LINES[:1])
+        lines, _, _, rotated = follow(self.path, size, 10)
+        self.assertTrue(rotated)
+        self.assertEqual(self.text(lines), LINES[:1])
+
+    def test_negative_offset(self):
+        with self.assertRaises(ValueError):
+            follow(self.path, -1, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Tests of the token bucket rate limiter
+"""
+
+import unittest
+from unittest import mock
+
+from skill_rest_api.ratelimit import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("skill_rest_api.ratelimit.time.monotonic")
+        self.clock = patcher.start()
+        self.clock.return_value = 100.0
+        self.addCleanup(patcher.stop)
+
+    def test_burst_then_retry_after(self):
+        limiter = RateLimiter(rate=2, burst=3)
+        self.assertEqual(
+            [limiter.acquire("client", "info") for _ in range(3)], [0.0] * 3
+        )
+        self.assertEqual(limiter.acquire("client", "info"), 0.5)
+
+    def test_tokens_are_refilled(self):
+        limiter = RateLimiter(rate=2, burst=1)
+        self.assertEqual(limiter.acquire("client"), 0.0)
+        self.assertTrue(limiter.acquire("client"))
+        self.clock.return_value += 0.5
+        self.assertEqual(limiter.acquire("client"), 0.0)
+
+    def test_refill_is_capped_by_the_burst(self):
+        limiter = RateLimiter(rate=10, burst=2)
+        limiter.acquire("client")
+        self.clock.return_value += 60
+        self.assertEqual([limiter.acquire("client") for _ in range(2)], [0.0] * 2)
+        self.assertTrue(limiter.acquire("client"))
+
+    def test_keys_have_their_own_bucket(self):
+        limiter = RateLimiter(rate=1, burst=1)
+        self.assertEqual(limiter.acquire("first", "info"), 0.0)
+        self.assertEqual(limiter.acquire("second", "info"), 0.0)
+        self.assertEqual(limiter.acquire("first", "config"), 0.0)
+        self.assertTrue(limiter.acquire("first", "info"))
+
+    def test_zero_rate_disables_the_limiter(self):
+        limiter = RateLimiter(rate=0, burst=1)
+        self.assertEqual([limiter.acquire("client") for _ in range(5)], [0.0] * 5)
+
+    def test_least_recently_used_buckets_are_dropped(self):
+        limiter = RateLimiter(rate=1, burst=1, max_buckets=2)
+        limiter.acquire("first")
+        limiter.acquire("second")
+        limiter.acquire("first")
+        limiter.acquire("third")
+        # The bucket of second was dropped, it starts full again.
+        self.assertEqual(limiter.acquire("second"), 0.0)
+        self.assertTrue(limiter.acquire("third"))
+
+    def test_configure_resets_the_buckets(self):
+        limiter = RateLimiter(rate=1, burst=1)
+        limiter.acquire("client")
+        limiter.configure(rate=1, burst=0)
+        self.assertEqual(limiter.burst, 1.0)
+        self.assertEqual(limiter.acquire("client"), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
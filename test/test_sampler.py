@@ -0,0 +1,74 @@
+"""Tests of the background sampling of the system load
+"""
+
+import os
+import tempfile
+import unittest
+
+from skill_rest_api.sampler import SystemSampler
+
+MEMINFO = {
+    "MemTotal": 1000,
+    "MemFree": 200,
+    "MemAvailable": 500,
+    "Buffers": 50,
+    "Cached": 150,
+}
+
+
+class TestSample(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: str = directory.name
+        self.descriptors = {}
+        self.addCleanup(self.close)
+        self.sampler = SystemSampler(interval=0, size=4)
+
+    def close(self):
+        for descriptor in self.descriptors.values():
+            os.close(descriptor)
+
+    def write(self, name, content):
+        path: str = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as proc:
+            proc.write(content)
+        if name not in self.descriptors:
+            self.descriptors[name] = os.open(path, os.O_RDONLY)
+
+    def sample(self, meminfo):
+        self.write("meminfo", "".join(f"{k}: {v} kB\n" for k, v in meminfo.items()))
+        self.write("loadavg", "0.50 0.25 0.10 1/100 1234\n")
+        self.write("statm", "1000 250 100 1 0 200 0\n")
+        self.write("stat", "cpu  100 0 100 700 100 0 0 0 0 0\n")
+        self.sampler._sample(self.descriptors)
+        self.write("stat", "cpu  150 0 150 750 150 0 0 0 0 0\n")
+        self.sampler._sample(self.descriptors)
+        return self.sampler.current()
+
+    def test_sample(self):
+        sample = self.sample(MEMINFO)
+        self.assertEqual(sample["cpu"], 50.0)
+        self.assertEqual(sample["memory"], 50.0)
+        self.assertEqual(sample["memory_available"], 500 * 1024)
+        self.assertEqual(sample["load_1"], 0.5)
+        self.assertEqual(sample["rss"], 250 * os.sysconf("SC_PAGE_SIZE"))
+
+    def test_without_mem_available(self):
+        meminfo = {k: v for k, v in MEMINFO.items() if k != "MemAvailable"}
+        sample = self.sample(meminfo)
+        self.assertEqual(sample["memory_available"], 400 * 1024)
+        self.assertEqual(sample["memory"], 60.0)
+
+    def test_memory_fields_missing(self):
+        sample = self.sample({"MemFree": 200})
+        self.assertIsNone(sample["memory"])
+        self.assertIsNone(sample["memory_available"])
+        self.assertEqual(sample["cpu"], 50.0)
+        history = self.sampler.history(10)
+        self.assertEqual(history["memory"], [None])
+        self.assertEqual(history["load_1"], [0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+"""Tests of the cache of the parsed settings.json files
+"""
+
+import tempfile
+import unittest
+from unittest import mock
+
+from skill_rest_api.settings_cache import SettingsCache
+
+
+class TestWatch(unittest.TestCase):
+    def test_missing_directory_falls_back_to_stat(self):
+        cache = SettingsCache()
+        self.assertFalse(cache.watch("/nonexistent/rest-api/skills"))
+        self.assertFalse(cache.watching)
+
+    def test_missing_watchdog_falls_back_to_stat(self):
+        cache = SettingsCache()
+        with mock.patch(
+            "ovos_utils.file_utils.FileWatcher",
+            side_effect=ImportError("No module named 'watchdog'"),
+        ):
+            self.assertFalse(cache.watch(tempfile.gettempdir()))
+        self.assertFalse(cache.watching)
+
+    def test_watch_existing_directory(self):
+        cache = SettingsCache()
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertTrue(cache.watch(directory))
+            self.assertTrue(cache.watching)
+            cache.unwatch()
+        self.assertFalse(cache.watching)
+
+
+if __name__ == "__main__":
+    unittest.main()
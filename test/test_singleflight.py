@@ -0,0 +1,96 @@
+"""Tests of the coalescing of identical requests
+"""
+
+import time
+import unittest
+from threading import Event, Thread
+
+from ovos_bus_client.message import Message
+
+from skill_rest_api.singleflight import SingleFlight, request_key
+
+
+class TestRequestKey(unittest.TestCase):
+    def test_per_request_fields_are_ignored(self):
+        first = Message("ovos.api.config", {"paths": ["/lang"], "app_key": "a"})
+        second = Message(
+            "ovos.api.config", {"app_key": "b", "request_id": "1", "paths": ["/lang"]}
+        )
+        self.assertEqual(request_key(first), request_key(second))
+
+    def test_data_and_type_are_part_of_the_key(self):
+        self.assertNotEqual(
+            request_key(Message("ovos.api.config", {"paths": ["/lang"]})),
+            request_key(Message("ovos.api.config", {"paths": ["/tts"]})),
+        )
+        self.assertNotEqual(
+            request_key(Message("ovos.api.info", {})),
+            request_key(Message("ovos.api.config", {})),
+        )
+
+
+class TestSingleFlight(unittest.TestCase):
+    def run_concurrently(self, flight, func, requesters=3):
+        """Start a slow call then join it from the other requesters."""
+        results = []
+        started = Event()
+        release = Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return func()
+
+        first = Thread(target=flight.do, args=("key", slow, results.append))
+        first.start()
+        started.wait(5)
+        for _ in range(requesters - 1):
+            flight.do("key", slow, results.append)
+        release.set()
+        first.join(5)
+        return results
+
+    def test_concurrent_requests_share_one_call(self):
+        calls = []
+        results = self.run_concurrently(
+            SingleFlight(), lambda: calls.append(1) or {"value": 1}
+        )
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, [{"value": 1}] * 3)
+
+    def test_failure_is_sent_to_every_requester(self):
+        def fail():
+            raise KeyError("lang")
+
+        results = self.run_concurrently(SingleFlight(ttl=60), fail)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all("error" in result for result in results))
+
+    def test_failure_is_not_kept(self):
+        flight = SingleFlight(ttl=60)
+        results = []
+        flight.do("key", lambda: 1 / 0, results.append)
+        flight.do("key", lambda: {"value": 1}, results.append)
+        self.assertIn("error", results[0])
+        self.assertEqual(results[1], {"value": 1})
+
+    def test_results_are_kept_for_the_ttl(self):
+        flight = SingleFlight(ttl=0.2)
+        results = []
+        flight.do("key", lambda: 1, results.append)
+        flight.do("key", lambda: 2, results.append)
+        time.sleep(0.25)
+        flight.do("key", lambda: 3, results.append)
+        self.assertEqual(results, [1, 1, 3])
+
+    def test_without_ttl_every_call_runs(self):
+        flight = SingleFlight()
+        results = []
+        flight.do("key", lambda: 1, results.append)
+        flight.do("key", lambda: 2, results.append)
+        flight.clear()
+        self.assertEqual(results, [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Tests of the state change subscriptions
+"""
+
+import unittest
+
+from skill_rest_api.subscriptions import Subscriptions, invalid_topics
+
+
+class TestInvalidTopics(unittest.TestCase):
+    def test_valid_topics(self):
+        self.assertIsNone(invalid_topics([]))
+        self.assertIsNone(invalid_topics(["awake", "cache"]))
+
+    def test_invalid_topics(self):
+        for topics in ("awake", [{"a": 1}], ["awake", 1], {"awake": True}, None):
+            with self.subTest(topics=topics):
+                self.assertEqual(
+                    invalid_topics(topics), "topics must be a list of topic names"
+                )
+
+    def test_unknown_topics(self):
+        self.assertEqual(
+            invalid_topics(["awake", "weather", "news"]), "unknown topics weather, news"
+        )
+
+
+class TestSubscriptions(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.subscriptions = Subscriptions(
+            lambda topic, state, clients: self.events.append((topic, state, clients)),
+            window=0,
+        )
+
+    def test_subscribe_and_unsubscribe(self):
+        self.assertEqual(
+            self.subscriptions.subscribe("client", ["cache", "awake"]),
+            ["awake", "cache"],
+        )
+        self.assertEqual(self.subscriptions.unsubscribe("client", ["awake"]), ["cache"])
+        self.subscriptions.subscribe("client", ["internet"])
+        self.assertEqual(self.subscriptions.unsubscribe("client"), [])
+
+    def test_changes_are_emitted_to_the_subscribers(self):
+        self.subscriptions.subscribe("first", ["awake"])
+        self.subscriptions.subscribe("second", ["awake", "internet"])
+        self.subscriptions.publish("awake", {"is_awake": False})
+        self.subscriptions.publish("awake", {"is_awake": False})
+        self.subscriptions.publish("internet", lambda: {"connected": True})
+        self.subscriptions.publish("config", {"hash": "abc"})
+        self.assertEqual(
+            self.events,
+            [
+                ("awake", {"is_awake": False}, ["first", "second"]),
+                ("internet", {"connected": True}, ["second"]),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Tests of the skill helpers
+"""
+
+import unittest
+from base64 import b64encode
+from types import SimpleNamespace
+from unittest import mock
+
+from ovos_bus_client.message import Message
+
+from skill_rest_api.ratelimit import RateLimiter
+from skill_rest_api.utils import check_auth, digest, resolve_pointer
+
+
+class TestResolvePointer(unittest.TestCase):
+    document: dict = {
+        "lang": "en-us",
+        "tts": {"module": "dummy", "a/b": 1, "m~n": 2},
+        "hotwords": [{"name": "hey_mycroft"}, {"name": "wake_up"}],
+    }
+
+    def test_whole_document(self):
+        self.assertIs(resolve_pointer(self.document, ""), self.document)
+
+    def test_nested_values(self):
+        self.assertEqual(resolve_pointer(self.document, "/lang"), "en-us")
+        self.assertEqual(resolve_pointer(self.document, "/tts/module"), "dummy")
+        self.assertEqual(resolve_pointer(self.document, "/hotwords/1/name"), "wake_up")
+
+    def test_escaped_tokens(self):
+        self.assertEqual(resolve_pointer(self.document, "/tts/a~1b"), 1)
+        self.assertEqual(resolve_pointer(self.document, "/tts/m~0n"), 2)
+
+    def test_unmatched_pointers(self):
+        for pointer in (
+            "lang",
+            "/missing",
+            "/tts/module/x",
+            "/hotwords/5",
+            "/hotwords/x",
+        ):
+            with self.subTest(pointer=pointer):
+                with self.assertRaises(KeyError):
+                    resolve_pointer(self.document, pointer)
+
+
+class TestDigest(unittest.TestCase):
+    def test_key_order_is_ignored(self):
+        self.assertEqual(digest({"a": 1, "b": [1, 2]}), digest({"b": [1, 2], "a": 1}))
+
+    def test_values_are_hashed(self):
+        self.assertNotEqual(digest({"a": 1}), digest({"a": 2}))
+
+
+class TestCheckAuth(unittest.TestCase):
+    def setUp(self):
+        self.answers = []
+        self.skill = SimpleNamespace(
+            configured=True,
+            api_digest=b64encode(b"secret"),
+            auth_limiter=RateLimiter(rate=0.2, burst=2),
+            metrics=mock.Mock(),
+            bus=SimpleNamespace(emit=self.answers.append),
+        )
+
+    def check(self, app_key, source):
+        self.answers.clear()
+        message = Message("ovos.api.info", {"app_key": app_key}, {"source": source})
+        return check_auth(self.skill, message)
+
+    def test_valid_key(self):
+        self.assertTrue(self.check(b64encode(b"secret").decode(), "api"))
+        self.assertEqual(self.answers, [])
+
+    def test_bad_key(self):
+        self.assertFalse(self.check("bad", "api"))
+        self.assertEqual(self.answers[0].data, {"error": "both keys don't match"})
+        self.assertFalse(self.answers[0].context["authenticated"])
+
+    def test_failures_are_throttled_per_sender(self):
+        for _ in range(2):
+            self.assertFalse(self.check("bad", "attacker"))
+        self.assertFalse(self.check("bad", "attacker"))
+        self.assertEqual(
+            self.answers[0].data["error"], "too many authentication failures"
+        )
+        self.assertFalse(self.check("bad", "api"))
+        self.assertEqual(self.answers[0].data, {"error": "both keys don't match"})
+
+    def test_valid_key_passes_once_throttled(self):
+        for _ in range(5):
+            self.check("bad", "attacker")
+        key: str = b64encode(b"secret").decode()
+        self.assertTrue(self.check(key, "api"))
+        self.assertTrue(self.check(key, "attacker"))
+
+    def test_no_api_key(self):
+        self.skill.configured, self.skill.api_digest = False, None
+        self.assertFalse(self.check("secret", "api"))
+        self.assertEqual(
+            self.answers[0].data, {"error": "no api key detected from home.mycroft.ai"}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()